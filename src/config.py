@@ -37,6 +37,8 @@ class Config:
     # Gemini API settings
     GEMINI_API_KEY   = "YOUR_GEMINI_API_KEY" # Replace with your actual Gemini API key
     GEMINI_MODEL     = "models/gemini-2.5-flash"         # Or other Gemini models like "gemini-1.5-pro-latest"
+    GEMINI_CONTEXT_CACHE = False         # Serve the static parser prompt from a server-side cachedContents entry
+    GEMINI_CONTEXT_CACHE_TTL = 1800      # Seconds a cachedContents entry lives before it is recreated
     
     # Novita LLM settings
     NOVITA_API_URL = "https://api.novita.ai/v3/openai/chat/completions" # Novita AI URL
@@ -52,4 +54,14 @@ class Config:
     LLM_MIN_P = 0.0 
     LLM_PRESENCE_PENALTY = 0.0 
     LLM_FREQUENCY_PENALTY = 0.0 
-    LLM_REQUEST_TIMEOUT = 30 
\ No newline at end of file
+    LLM_REQUEST_TIMEOUT = 30 
+    LLM_MAX_RETRIES = 3      # Retries on timeouts, 429 and 5xx before a provider call gives up
+
+    # Intent parsing cache (exact match on prompt + user input). The prompt carries the current minute,
+    # so this only dedupes commands repeated within the same minute
+    INTENT_CACHE_MAXSIZE = 64
+    INTENT_CACHE_TTL = 60  # Seconds before a cached intent list is discarded
+    # Semantic cache for paraphrased commands (requires numpy and sentence-transformers)
+    SEMANTIC_INTENT_CACHE = False
+    SEMANTIC_INTENT_CACHE_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+    SEMANTIC_INTENT_CACHE_THRESHOLD = 0.93  # Minimum cosine similarity to reuse cached intents
\ No newline at end of file
@@ -1,11 +1,12 @@
 import json
 import os
 import importlib
+import threading
 import datetime # date/time operations
 import pytz # timezone handling
 from dateutil.relativedelta import relativedelta # date calculations
 
-from llm.llm_client import parse_intents, generate_response, update_system_chat_capabilities
+from llm.llm_client import parse_intents, generate_response, update_system_chat_capabilities, prewarm, CURRENT_CONTEXT_MARKER, CURRENT_TIME_LABEL
 from modules.base_automation import BaseAutomationModule
 from config import Config 
 
@@ -14,6 +15,9 @@ class Backend:
         self.voice = voice_module
         self.tts = tts_module
 
+        # Open the LLM connection in the background while modules load
+        threading.Thread(target=prewarm, daemon=True).start()
+
         # Initialize conversation history for conversational responses
         # This will store {"role": "user", "content": "..."} and {"role": "assistant", "content": "..."}
         self.conversation_history = [] 
@@ -113,8 +117,8 @@ class Backend:
 
         # Construct the current context string for the LLM
         current_context_for_llm = (
-            f"\n\n--- CURRENT CONTEXT ---\n"
-            f"Current Date and Time (Local): {current_date_time_str}\n"
+            f"{CURRENT_CONTEXT_MARKER}"
+            f"{CURRENT_TIME_LABEL}{current_date_time_str}\n"
             f"Current Date (Local): {current_date_str}\n"
             f"Current Year: {current_year_str}\n"
             f"Current Week (Monday-Sunday): {current_week_range_str}\n"
@@ -143,7 +147,10 @@ class Backend:
         results = []
         action_executed = False
 
-        for it in intents:
+        index = 0
+        while index < len(intents):
+            it = intents[index]
+            index += 1
             act = it.get("action")
             
             if act == "none":
@@ -159,6 +166,31 @@ class Backend:
             
             kwargs = {k: v for k, v in it.items() if k not in ["action"]}
 
+            # Modules exposing batch_execute receive every consecutive intent addressed to them in a
+            # single call, so independent network requests can overlap instead of running back to back
+            if hasattr(module_instance, "batch_execute"):
+                batch = [(method_name, kwargs)]
+                while index < len(intents):
+                    next_act = intents[index].get("action")
+                    if next_act not in self.supported_actions_map or self.supported_actions_map[next_act][0] is not module_instance:
+                        break
+                    batch.append((
+                        self.supported_actions_map[next_act][1],
+                        {k: v for k, v in intents[index].items() if k not in ["action"]}
+                    ))
+                    index += 1
+
+                if len(batch) > 1:
+                    try:
+                        results.extend(module_instance.batch_execute(batch))
+                        action_executed = True
+                    except Exception as e:
+                        print(f"ERROR: Failed to execute batched actions from module '{type(module_instance).__name__}'. Details: {e}")
+                        response = "Sorry, I encountered an error while trying to run those commands."
+                        self.conversation_history.append({"role": "assistant", "content": response})
+                        return response
+                    continue
+
             try:
                 method_to_call = getattr(module_instance, method_name)
                 result = method_to_call(**kwargs)
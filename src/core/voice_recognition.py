@@ -4,7 +4,7 @@ import speech_recognition as sr
 from config import Config
 
 class VoiceRecognitionBase:
-    def listen(self):
+    def listen(self, stop_event=None):
         raise NotImplementedError("listen() must be implemented by subclass.")
 
 class SpeechRecognitionModule(VoiceRecognitionBase):
@@ -25,11 +25,19 @@ class SpeechRecognitionModule(VoiceRecognitionBase):
     def set_language(self, lang_code):
         self.language = lang_code
 
-    def listen(self):
+    def listen(self, stop_event=None):
         print("Listening using SpeechRecognition...")
         with self.microphone as source:
             try:
-                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
+                # Wait for speech in 1 s slices (5 s overall) so a set stop_event ends the wait promptly
+                for remaining in range(5, 0, -1):
+                    if stop_event is not None and stop_event.is_set():
+                        return None
+                    try:
+                        audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=10)
+                        break
+                    except sr.WaitTimeoutError:
+                        if remaining == 1: raise
                 # Use the set language code when recognizing speech
                 command = self.recognizer.recognize_google(audio, language=self.language)
                 print(f"Recognized: {command}")
@@ -0,0 +1,171 @@
+# llm/intent_cache.py
+# Caches of parsed intents (exact-match and semantic), shared by every LLM provider.
+import copy
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+
+# numpy and sentence-transformers are optional: without them the semantic cache stays disabled
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    np = None
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+
+class IntentCache:
+    """
+    Thread-safe LRU cache mapping (provider, model, system prompt, user input) to the
+    intent list the LLM returned for it. Entries expire after `ttl` seconds.
+    Keys are blake2b digests, so the multi-KB prompts are not kept in memory.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict() # key -> (expiry_ts, intents)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(provider: str, model: str, system_prompt: str, user_input: str) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (provider, model, system_prompt, user_input):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0") # Separator so ("ab", "c") and ("a", "bc") differ
+        return digest.digest()
+
+    def get(self, key: bytes):
+        """Returns a copy of the cached intents for `key`, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expiry_ts, intents = entry
+            if time.time() >= expiry_ts:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # Callers (and the backend) may mutate the returned dicts
+        return copy.deepcopy(intents)
+
+    def put(self, key: bytes, intents: list[dict]):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, copy.deepcopy(intents))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SemanticIntentCache:
+    """
+    Near-duplicate lookup for paraphrased commands ("make folder X" / "create a folder named X").
+    User inputs are embedded with a small sentence-transformers model; a cached intent list is
+    reused when the cosine similarity to an earlier input under the same scope (provider, model
+    and static system prompt) reaches `threshold` and every argument value of those intents appears
+    literally in the new input, so "delete file report2.txt" never reuses the intents of
+    "delete file report1.txt". The model is loaded lazily on first use.
+    """
+
+    def __init__(self, enabled: bool, model_name: str, threshold: float, maxsize: int, max_scopes: int = 8):
+        self.enabled = enabled and np is not None and SentenceTransformer is not None
+        if enabled and not self.enabled:
+            logger.warning("Semantic intent cache requires numpy and sentence-transformers; it is disabled.")
+        self.model_name = model_name
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.max_scopes = max_scopes
+        self._model = None
+        # scope -> (normalized embedding matrix [n, dim], intent lists); scopes only change with the
+        # provider, model or actions list, so only the most recent few are kept
+        self._scopes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _encode(self, text: str):
+        if self._model is None:
+            self._model = SentenceTransformer(self.model_name)
+        return self._model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+    def lookup(self, scope: bytes, user_input: str):
+        """
+        Returns (intents, embedding). intents is a copy of the closest cached intent list,
+        or None on a miss; pass embedding back to add() to store the fresh result.
+        """
+        if not self.enabled:
+            return None, None
+        try:
+            embedding = self._encode(user_input)
+        except Exception as e:
+            logger.warning("Semantic intent cache disabled, embedding failed: %s", e)
+            self.enabled = False
+            return None, None
+
+        with self._lock:
+            entry = self._scopes.get(scope)
+            if entry is None:
+                return None, embedding
+            matrix, intents_list = entry
+            similarities = matrix @ embedding # Rows are normalized, so this is cosine similarity
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            normalized_input = user_input.casefold()
+            for index in candidates[np.argsort(-similarities[candidates])]:
+                if self._arguments_in_input(intents_list[index], normalized_input):
+                    self._scopes.move_to_end(scope)
+                    logger.debug("Semantic intent cache hit (similarity %.3f).", similarities[index])
+                    return copy.deepcopy(intents_list[index]), embedding
+            return None, embedding
+
+    @classmethod
+    def _arguments_in_input(cls, intents, normalized_input: str) -> bool:
+        """True if every argument value (everything but "action") occurs in the casefolded input."""
+        for intent in intents:
+            for name, value in intent.items():
+                if name != "action" and not cls._value_in_input(value, normalized_input):
+                    return False
+        return True
+
+    @classmethod
+    def _value_in_input(cls, value, normalized_input: str) -> bool:
+        if isinstance(value, dict):
+            return all(cls._value_in_input(v, normalized_input) for v in value.values())
+        if isinstance(value, list):
+            return all(cls._value_in_input(v, normalized_input) for v in value)
+        if value is None:
+            return True
+        return str(value).casefold() in normalized_input
+
+    def add(self, scope: bytes, embedding, intents: list[dict]):
+        if not self.enabled or embedding is None:
+            return
+        with self._lock:
+            entry = self._scopes.get(scope)
+            if entry is None:
+                matrix, intents_list = embedding[np.newaxis, :], []
+            else:
+                matrix, intents_list = entry
+                matrix = np.vstack((matrix, embedding))[-self.maxsize:]
+            intents_list = (intents_list + [copy.deepcopy(intents)])[-self.maxsize:]
+            self._scopes[scope] = (matrix, intents_list)
+            self._scopes.move_to_end(scope)
+            while len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+
+
+# Singleton instances
+intent_cache = IntentCache(Config.INTENT_CACHE_MAXSIZE, Config.INTENT_CACHE_TTL)
+semantic_intent_cache = SemanticIntentCache(
+    Config.SEMANTIC_INTENT_CACHE,
+    Config.SEMANTIC_INTENT_CACHE_MODEL,
+    Config.SEMANTIC_INTENT_CACHE_THRESHOLD,
+    Config.INTENT_CACHE_MAXSIZE,
+)
@@ -1,7 +1,203 @@
+import asyncio
+import functools
 import json
+import logging
+import time
 from abc import ABC, abstractmethod
+from typing import AsyncIterable, Iterable, Iterator, Optional
 from config import Config
-import re
+
+logger = logging.getLogger(__name__)
+
+# orjson is optional: when installed it decodes/encodes JSON several times faster than the stdlib
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+    _JsonFragment = getattr(orjson, "Fragment", None) # orjson >= 3.9
+except ImportError:
+    json_loads = json.loads
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+    _JsonFragment = None
+
+@functools.lru_cache(maxsize=8)
+def json_string_fragment(text: str):
+    """
+    The text pre-serialized as a JSON string, for embedding in json_dumps payloads. The multi-KB
+    static system prompts are then escaped and UTF-8 encoded once instead of on every request;
+    pass only text that repeats across requests, never the per-request context.
+    Returns the plain str when orjson.Fragment is unavailable.
+    """
+    if _JsonFragment is None:
+        return text
+    return _JsonFragment(orjson.dumps(text))
+
+# ─── JSON Extraction Helpers ───────────────────────────────────────────────────
+# Plain str.find scans: the response structure is trivial, so no regex engine is needed
+_FENCE = "```"
+
+def _find_fenced_block(text: str) -> Optional[str]:
+    """
+    Returns the stripped content of the first markdown code block (```lang ... ```),
+    or None if the text has no complete block.
+    """
+    fence_start = text.find(_FENCE)
+    if fence_start == -1:
+        return None
+    content_start = fence_start + len(_FENCE)
+    # Skip the optional language tag (e.g. "json")
+    while content_start < len(text) and (text[content_start].isalnum() or text[content_start] == "_"):
+        content_start += 1
+    fence_end = text.find(_FENCE, content_start)
+    if fence_end == -1:
+        return None
+    return text[content_start:fence_end].strip()
+
+def _find_array_span(text: str) -> Optional[str]:
+    """Returns the outermost '[' ... ']' span of the text, or None if there is none."""
+    start = text.find("[")
+    if start == -1:
+        return None
+    end = text.rfind("]")
+    if end < start:
+        return None
+    return text[start:end + 1]
+
+# ─── Streaming Helpers ─────────────────────────────────────────────────────────
+class JsonStreamScanner:
+    """
+    Incremental bracket tracker for streamed intent responses. feed() text deltas as they arrive;
+    it returns True once a top-level JSON array of objects is closed, so the caller can stop
+    collecting the generation, and value_text then holds exactly that array. Brackets inside strings
+    are ignored. Bracketed prose before the JSON (e.g. "Here is [the plan]:", "step [1]") is skipped
+    because it does not parse as a list of objects, and a top-level '{...}' never stops the scan,
+    since further objects (JSON lines) may follow it.
+    """
+    __slots__ = ("depth", "started", "in_string", "escaped", "value_text", "_parts", "_length", "_start", "_opener")
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+        self.value_text = None # The completed intent array, once feed() has returned True
+        self._parts = [] # Text fed so far, to check the candidate value once it closes
+        self._length = 0
+        self._start = 0 # Offset of the opening bracket of the current candidate
+        self._opener = "" # "[" or "{" for the current candidate
+
+    def feed(self, chunk: str) -> bool:
+        offset = self._length
+        self._parts.append(chunk)
+        self._length += len(chunk)
+        for i, ch in enumerate(chunk):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = self.started # Quotes in prose before the JSON do not count
+            elif ch == "[" or ch == "{":
+                if not self.started:
+                    self._start = offset + i
+                    self._opener = ch
+                self.depth += 1
+                self.started = True
+            elif (ch == "]" or ch == "}") and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    if self._opener == "[" and self._capture_intent_array(offset + i + 1):
+                        return True
+                    self.started = False # Prose or a lone object: keep scanning
+                    self.in_string = False
+        return False
+
+    def _capture_intent_array(self, end: int) -> bool:
+        text = "".join(self._parts)
+        self._parts = [text]
+        candidate = text[self._start:end]
+        try:
+            value = json_loads(candidate)
+        except ValueError: # json.JSONDecodeError and orjson.JSONDecodeError both subclass it
+            return False
+        # Intents are a list of objects; "[1]" in prose is a citation, not the answer
+        if not all(isinstance(v, dict) for v in value):
+            return False
+        self.value_text = candidate
+        return True
+
+def iter_sse_deltas(lines: Iterable[bytes]) -> Iterator[str]:
+    """Yields the content deltas of an OpenAI-style server-sent event stream (e.g. requests' iter_lines())."""
+    for line in lines:
+        if not line.startswith(b"data:"):
+            continue
+        data = line[5:].strip()
+        if data == b"[DONE]":
+            # Read the body to its end, so requests hands the connection back to the pool
+            for _ in lines:
+                pass
+            return
+        choices = json_loads(data).get("choices")
+        if choices:
+            content = (choices[0].get("delta") or {}).get("content")
+            if content:
+                yield content
+
+# Once the intent JSON is complete, the rest of the stream (normally just the end-of-stream events)
+# is still read so the HTTP connection can go back to the pool. A model that keeps generating past
+# this budget is cut off instead, at the cost of that connection.
+STREAM_DRAIN_MAX_CHARS = 1024
+STREAM_DRAIN_MAX_SECONDS = 1.0
+
+def read_streamed_json_text(deltas: Iterable[str]) -> str:
+    """
+    Returns the intent JSON array from streamed text deltas as soon as it is complete (just the array,
+    without any prose around it), or the whole text if no such array shows up. The deltas after the
+    array are drained within the budget above but not returned; reading stops early only if it runs out.
+    """
+    scanner = JsonStreamScanner()
+    parts = []
+    deltas = iter(deltas)
+    for delta in deltas:
+        parts.append(delta)
+        if scanner.feed(delta):
+            break
+    else:
+        return "".join(parts)
+
+    drained = 0
+    deadline = time.monotonic() + STREAM_DRAIN_MAX_SECONDS
+    for delta in deltas:
+        drained += len(delta)
+        if drained > STREAM_DRAIN_MAX_CHARS or time.monotonic() > deadline:
+            logger.debug("Model kept generating after the intent JSON. Closing the stream early.")
+            break
+    return scanner.value_text
+
+async def read_streamed_json_text_async(deltas: AsyncIterable[str]) -> str:
+    """Async variant of read_streamed_json_text, with the same drain budget."""
+    scanner = JsonStreamScanner()
+    parts = []
+    deltas = deltas.__aiter__()
+    async for delta in deltas:
+        parts.append(delta)
+        if scanner.feed(delta):
+            break
+    else:
+        return "".join(parts)
+
+    drained = 0
+    deadline = time.monotonic() + STREAM_DRAIN_MAX_SECONDS
+    async for delta in deltas:
+        drained += len(delta)
+        if drained > STREAM_DRAIN_MAX_CHARS or time.monotonic() > deadline:
+            logger.debug("Model kept generating after the intent JSON. Closing the stream early.")
+            break
+    return scanner.value_text
 
 # ─── Shared Prompts ────────────────────────────────────────────────────────────
 # This is the base system chat prompt that describes the assistant's capabilities.
@@ -51,6 +247,51 @@ of action objects.
 Your response MUST be a valid JSON array. Do NOT include any other text, explanations, or markdown outside the JSON array.
 """
 
+# Header the backend puts in front of the per-request date/time block appended to the actions prompt.
+# Everything before it is static for the session; providers may split on it to cache the prefix.
+CURRENT_CONTEXT_MARKER = "\n\n--- CURRENT CONTEXT ---\n"
+# Label of the context line carrying the local time as YYYY-MM-DDTHH:MM:SS
+CURRENT_TIME_LABEL = "Current Date and Time (Local): "
+
+def intent_cache_prompt(system_prompt: str) -> str:
+    """
+    The parser prompt as it goes into intent cache keys: the seconds of the current time are dropped,
+    so a command repeated within the same minute hits the cache. This is deliberately a same-minute
+    dedupe; keying on the date alone would replay stale absolute times for commands like "in 2 hours".
+    """
+    label_at = system_prompt.find(CURRENT_TIME_LABEL)
+    if label_at == -1:
+        return system_prompt
+    minute_end = label_at + len(CURRENT_TIME_LABEL) + len("YYYY-MM-DDTHH:MM")
+    return system_prompt[:minute_end] + system_prompt[minute_end + len(":SS"):]
+
+def split_parser_prompt(system_prompt: str) -> tuple[str, str]:
+    """Splits a parser prompt into its static part and the per-request context block (marker included)."""
+    static_prompt, marker, current_context = system_prompt.partition(CURRENT_CONTEXT_MARKER)
+    return static_prompt, marker + current_context
+
+@functools.lru_cache(maxsize=8)
+def _static_parser_prompt(static_actions_prompt: str) -> str:
+    return BASE_SYSTEM_PARSER + static_actions_prompt
+
+def build_parser_prompt(available_actions_prompt: str = "") -> str:
+    """
+    Full intent-parser system prompt: BASE_SYSTEM_PARSER followed by the backend's actions prompt
+    (which already carries its own headers). The static part is memoized per actions list, so it is
+    the same string object on every call; only the per-request context block is appended each time.
+    """
+    static_actions_prompt, current_context = split_parser_prompt(available_actions_prompt or "")
+    return _static_parser_prompt(static_actions_prompt) + current_context
+
+# Appended to the parser prompt when several instructions are parsed in one call
+BATCH_PARSER_SUFFIX = """
+
+--- BATCH MODE ---
+The user message contains several numbered instructions. Parse each one independently and return
+a JSON array with exactly one element per instruction, in the same order. Each element is the
+JSON array of action objects for that instruction (use [{"action":"none"}] for conversational ones).
+"""
+
 #   - When an example uses a placeholder (e.g., "DIRECTORY", "FILENAME"), you must replace that placeholder with the actual value provided by the user in their instruction.
 
 # ─── LLMClient Interface ───────────────────────────────────────────────────────
@@ -72,6 +313,56 @@ class LLMClient(ABC):
         """
         pass
 
+    async def parse_intents_async(self, user_input: str, available_actions_prompt: str = "") -> list[dict]:
+        """
+        Awaitable parse_intents. By default the blocking call runs in a worker thread;
+        providers with a native async HTTP client override this.
+        """
+        return await asyncio.to_thread(self.parse_intents, user_input, available_actions_prompt)
+
+    async def generate_response_async(self, prompt: str, history: list[dict] = None, system_prompt: str = SYSTEM_CHAT) -> str:
+        """Awaitable generate_response; same threading default as parse_intents_async."""
+        return await asyncio.to_thread(self.generate_response, prompt, history, system_prompt)
+
+    def parse_intents_batch(self, user_inputs: list[str], available_actions_prompt: str = "") -> list[list[dict]]:
+        """
+        Parses several independent instructions with a single LLM call (one HTTP round-trip and
+        one prefill of the shared prompt instead of N). Returns one intent list per input, in order.
+        Falls back to per-input parse_intents when the reply does not line up with the inputs.
+        """
+        if len(user_inputs) <= 1:
+            return [self.parse_intents(user_input, available_actions_prompt) for user_input in user_inputs]
+
+        system_prompt = build_parser_prompt(available_actions_prompt) + BATCH_PARSER_SUFFIX
+        numbered_inputs = "\n".join(f"{i}. {user_input}" for i, user_input in enumerate(user_inputs, 1))
+        raw_response_text = self.generate_response(numbered_inputs, None, system_prompt)
+
+        try:
+            batches = self._extract_json_from_response(raw_response_text)
+            if len(batches) == len(user_inputs) and all(isinstance(intents, list) for intents in batches):
+                for intents in batches:
+                    self._validate_intents_schema(intents)
+                return [intents or [{"action": "none"}] for intents in batches]
+        except ValueError as e:
+            logger.debug("Batched intent response failed validation: %s", e)
+
+        logger.debug("Batched intent response did not match %d inputs. Parsing them one by one.", len(user_inputs))
+        return [self.parse_intents(user_input, available_actions_prompt) for user_input in user_inputs]
+
+    async def aclose(self):
+        """
+        Releases the connections of the async HTTP client, if the provider keeps one. Await it before
+        the event loop that used parse_intents_async / generate_response_async ends. No-op by default.
+        """
+        pass
+
+    def prewarm(self):
+        """
+        Opens the provider connection ahead of the first real request (DNS, TCP and TLS setup),
+        so the first command does not pay for the handshake. Best effort; no-op by default.
+        """
+        pass
+
     def _validate_intents_schema(self, intents: list[dict]):
         """
         Validates the structure of the parsed intents.
@@ -82,8 +373,22 @@ class LLMClient(ABC):
         for intent in intents:
             if not isinstance(intent, dict):
                 raise ValueError("Each intent in the list must be a dictionary.")
-            if "action" not in intent:
-                raise ValueError("Each intent dictionary must contain an 'action' key.")
+            if intent.get("action") is None:
+                raise ValueError("Each intent dictionary must contain a non-null 'action' key.")
+
+    def _postprocess_intent_response(self, raw_response_text: str) -> tuple[list[dict], bool]:
+        """
+        Shared tail of every provider's parse_intents: extracts the JSON array from the raw LLM reply
+        and validates it. Returns (intents, cacheable). A reply without JSON (the model answered
+        conversationally or ignored the format) becomes [{"action": "none"}] with cacheable False,
+        so a one-off bad reply is not replayed from the intent caches; malformed intents raise ValueError.
+        """
+        intents = self._extract_json_from_response(raw_response_text.strip())
+        if not intents:
+            logger.debug("No intents extracted from the LLM response. Assuming no action was intended.")
+            return [{"action": "none"}], False
+        self._validate_intents_schema(intents)
+        return intents, True
 
     def _extract_json_from_response(self, raw_response_text: str) -> list[dict]:
         """
@@ -92,78 +397,77 @@ class LLMClient(ABC):
         Returns a list of dictionaries. Returns an empty list if no valid JSON can be extracted.
         """
         json_string_to_parse = raw_response_text.strip()
-        print(f"DEBUG: Raw response text for JSON extraction:\n---\n{raw_response_text}\n---")
+        logger.debug("Raw response text for JSON extraction:\n---\n%s\n---", raw_response_text)
 
         # Strategy 1: Attempt to extract content from a markdown code block (most common case)
-        match = re.search(r"```(?:\w+)?\s*(.*?)\s*```", json_string_to_parse, re.DOTALL)
+        fenced_block = _find_fenced_block(json_string_to_parse)
         
-        if match:
-            json_string_to_parse = match.group(1).strip()
-            print(f"DEBUG: Extracted JSON string from markdown block:\n---\n{json_string_to_parse}\n---")
+        if fenced_block is not None:
+            json_string_to_parse = fenced_block
+            logger.debug("Extracted JSON string from markdown block:\n---\n%s\n---", json_string_to_parse)
         else:
-            print(f"DEBUG: No markdown block found. Checking for array boundaries.")
+            logger.debug("No markdown block found. Checking for array boundaries.")
 
         # Strategy 2: Attempt to parse the entire string directly as JSON first
         try:
-            parsed_json = json.loads(json_string_to_parse)
+            parsed_json = json_loads(json_string_to_parse)
             if isinstance(parsed_json, dict):
-                print(f"DEBUG: Parsed as single JSON object. Wrapping in list.")
+                logger.debug("Parsed as single JSON object. Wrapping in list.")
                 return [parsed_json]
             elif isinstance(parsed_json, list):
-                print(f"DEBUG: Parsed as JSON array.")
+                logger.debug("Parsed as JSON array.")
                 return parsed_json
             else:
-                print(f"DEBUG: Parsed JSON is neither dict nor list ({type(parsed_json)}). Returning empty list.")
+                logger.debug("Parsed JSON is neither dict nor list (%s). Returning empty list.", type(parsed_json))
                 return []
         except json.JSONDecodeError:
-            print(f"DEBUG: Direct JSON parse failed. Attempting array boundary refinement.")
+            logger.debug("Direct JSON parse failed. Attempting array boundary refinement.")
             pass # Continue to the next strategy if direct parse fails
 
         # Strategy 3: Further refine by finding the outermost JSON array boundaries '[' and ']'
-        first_bracket = json_string_to_parse.find('[')
-        last_bracket = json_string_to_parse.rfind(']')
+        array_span = _find_array_span(json_string_to_parse)
 
-        if first_bracket != -1 and last_bracket != -1 and last_bracket > first_bracket:
-            json_string_to_parse = json_string_to_parse[first_bracket : last_bracket + 1]
-            print(f"DEBUG: Refined JSON string to array boundaries:\n---\n{json_string_to_parse}\n---")
+        if array_span is not None:
+            json_string_to_parse = array_span
+            logger.debug("Refined JSON string to array boundaries:\n---\n%s\n---", json_string_to_parse)
         else:
-            print(f"DEBUG: Could not find valid array boundaries. Attempting to parse raw string if it looks like JSON.")
+            logger.debug("Could not find valid array boundaries. Attempting to parse raw string if it looks like JSON.")
             # If no array boundaries, it might be a single object not in markdown.
             # Try parsing the original string again as a single object if it wasn't already tried successfully.
             try:
-                parsed_json = json.loads(raw_response_text.strip())
+                parsed_json = json_loads(raw_response_text.strip())
                 if isinstance(parsed_json, dict):
-                    print(f"DEBUG: Parsed as single JSON object after boundary check. Wrapping in list.")
+                    logger.debug("Parsed as single JSON object after boundary check. Wrapping in list.")
                     return [parsed_json]
                 else:
-                    print(f"DEBUG: Parsed JSON is not a dict or list after boundary check. Returning empty list.")
+                    logger.debug("Parsed JSON is not a dict or list after boundary check. Returning empty list.")
                     return []
             except json.JSONDecodeError:
-                print(f"DEBUG: Final JSON parse attempt failed. Returning empty list.")
+                logger.debug("Final JSON parse attempt failed. Returning empty list.")
                 return [] # Return empty list if no valid JSON can be extracted
             except Exception as e:
-                print(f"DEBUG: Unexpected error during final JSON parse attempt: {e}. Returning empty list.")
+                logger.debug("Unexpected error during final JSON parse attempt: %s. Returning empty list.", e)
                 return []
 
 
         try:
             # Attempt to load JSON. If it fails, this block will catch it.
-            parsed_json = json.loads(json_string_to_parse)
+            parsed_json = json_loads(json_string_to_parse)
 
             # Ensure the output is always a list of dictionaries
             if isinstance(parsed_json, dict):
                 parsed_json = [parsed_json]
             elif not isinstance(parsed_json, list):
                 # If it's not a dict or list, it's not the expected action format
-                print(f"DEBUG: LLM returned unexpected JSON type: {type(parsed_json)}. Expected dict or list. Returning empty list.")
+                logger.debug("LLM returned unexpected JSON type: %s. Expected dict or list. Returning empty list.", type(parsed_json))
                 return []
             
             return parsed_json
         except json.JSONDecodeError as e:
-            print(f"DEBUG: JSONDecodeError during parsing: {e}. Returning empty list.")
+            logger.debug("JSONDecodeError during parsing: %s. Returning empty list.", e)
             return [] # Return empty list if JSON parsing fails
         except Exception as e:
-            print(f"DEBUG: Unexpected error during JSON extraction: {e}. Returning empty list.")
+            logger.debug("Unexpected error during JSON extraction: %s. Returning empty list.", e)
             return [] # Catch any other unexpected errors during extraction
 
 # ─── Factory & Module-Level API ────────────────────────────────────────────────
@@ -197,9 +501,27 @@ def parse_intents(user_input: str, available_actions_prompt: str = "") -> list[d
     # Pass all relevant context to the client's method
     return _client.parse_intents(user_input, available_actions_prompt)
 
+def parse_intents_batch(user_inputs: list[str], available_actions_prompt: str = "") -> list[list[dict]]:
+    return _client.parse_intents_batch(user_inputs, available_actions_prompt)
+
+def prewarm():
+    try:
+        _client.prewarm()
+    except Exception as e:
+        logger.debug("LLM connection prewarm failed: %s", e)
+
 def generate_response(prompt: str, history: list[dict] = None) -> str:
     # Concatenate the base SYSTEM_CHAT with the dynamic capabilities text
     full_system_chat_prompt = SYSTEM_CHAT + _dynamic_capabilities_text
     # Pass the full_system_chat_prompt to the client's generate_response method
     return _client.generate_response(prompt, history, full_system_chat_prompt)
 
+async def parse_intents_async(user_input: str, available_actions_prompt: str = "") -> list[dict]:
+    return await _client.parse_intents_async(user_input, available_actions_prompt)
+
+async def generate_response_async(prompt: str, history: list[dict] = None) -> str:
+    full_system_chat_prompt = SYSTEM_CHAT + _dynamic_capabilities_text
+    return await _client.generate_response_async(prompt, history, full_system_chat_prompt)
+
+async def aclose():
+    await _client.aclose()
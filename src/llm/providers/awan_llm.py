@@ -1,9 +1,14 @@
 import json
+import logging
 import requests
-import re
-from llm.llm_client import LLMClient, SYSTEM_CHAT, BASE_SYSTEM_PARSER
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from llm.llm_client import LLMClient, SYSTEM_CHAT, build_parser_prompt, split_parser_prompt, intent_cache_prompt, iter_sse_deltas, read_streamed_json_text, json_loads, json_dumps, json_string_fragment
+from llm.intent_cache import intent_cache, semantic_intent_cache
 from config import Config 
 
+logger = logging.getLogger(__name__)
+
 class AwanLLMClient(LLMClient):
     """LLMClient implementation for Awan LLM API."""
 
@@ -17,59 +22,80 @@ class AwanLLMClient(LLMClient):
             "top_p": Config.LLM_TOP_P,
             "top_k": Config.LLM_TOP_K,
             "max_tokens": 1000,
-            "stream": False, # Keeping False as current parsing logic expects non-streaming
+            "stream": False, # Chat replies are read whole; parse_intents streams
             "repetition_penalty": 1.1 
         }
+        # Persistent session: reuses the TLS connection across calls and carries the auth headers
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=Config.LLM_MAX_RETRIES,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False,
+            ),
+        ))
+        self._session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
+
+    def prewarm(self):
+        # Any response (even 405) leaves a pooled keep-alive connection behind
+        self._session.head(self.api_url, timeout=5)
 
     def parse_intents(self, user_input: str, available_actions_prompt: str = "") -> list[dict]:
         
-        # Build the full system parser prompt dynamically, including base rules,
-        # available actions
-        full_system_parser_prompt = BASE_SYSTEM_PARSER
-        
-        if available_actions_prompt:
-            # The available_actions_prompt already contains its own headers (e.g., "--- Currently Available Automation Actions ---")
-            full_system_parser_prompt += available_actions_prompt
+        # Base rules + available actions, shared with the other providers
+        full_system_parser_prompt = build_parser_prompt(available_actions_prompt)
+        static_prompt, current_context = split_parser_prompt(full_system_parser_prompt)
+
+        # Repeated commands under the same prompt (within the same minute) skip the LLM round-trip entirely
+        cache_prompt = intent_cache_prompt(full_system_parser_prompt)
+        cache_key = intent_cache.make_key("awan", self.base_params["model"], cache_prompt, user_input)
+        cached_intents = intent_cache.get(cache_key)
+        if cached_intents is not None:
+            return cached_intents
+        # Paraphrases of earlier commands can reuse their intents too (no-op unless enabled); scoped on
+        # the static prompt only, so hits are not limited to the current minute
+        semantic_scope = intent_cache.make_key("awan", self.base_params["model"], static_prompt, "")
+        cached_intents, input_embedding = semantic_intent_cache.lookup(semantic_scope, user_input)
+        if cached_intents is not None:
+            return cached_intents
 
+        # The static rules + actions are pre-encoded once per actions list; the per-request date/time
+        # block rides with the user message, as on Gemini's cached-context path
         payload = {
             **self.base_params,
+            "stream": True, # Streamed so reading can stop as soon as the JSON array is complete
             "messages": [
-                {"role": "system", "content": full_system_parser_prompt}, # Use dynamically built prompt
-                {"role": "user",   "content": user_input}
+                {"role": "system", "content": json_string_fragment(static_prompt)},
+                {"role": "user",   "content": f"{current_context.strip()}\n\n{user_input}" if current_context else user_input}
             ]
         }
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         try:
-            res = requests.post(self.api_url, headers=headers, json=payload)
-            res.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-            
-            raw_response_text = res.json()["choices"][0]["message"]["content"]
-            
-            # Use the shared helper method from the base class to extract and parse JSON
-            parsed_json = self._extract_json_from_response(raw_response_text)
-
-            # Check if parsed_json is empty (meaning no valid JSON was extracted)
-            if not parsed_json:
-                print("DEBUG: _extract_json_from_response returned an empty list. Assuming no action was intended.")
-                # If no JSON was extracted, it likely means the LLM responded conversationally
-                # or failed to follow the JSON format. Return "none" action.
-                return [{"action": "none"}]
+            res = self._session.post(self.api_url, data=json_dumps(payload), timeout=Config.LLM_REQUEST_TIMEOUT, stream=True)
+            with res: # Only closes the connection if the model overran the drain budget
+                res.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
+                raw_response_text = read_streamed_json_text(iter_sse_deltas(res.iter_lines()))
 
-            self._validate_intents_schema(parsed_json) # Validate the schema of the parsed JSON using base class method
+            parsed_json, cacheable = self._postprocess_intent_response(raw_response_text)
+            if cacheable: # Fallbacks for replies without JSON are not cached
+                intent_cache.put(cache_key, parsed_json)
+                semantic_intent_cache.add(semantic_scope, input_embedding, parsed_json)
             return parsed_json
         except (json.JSONDecodeError, ValueError) as e:
-            # Catch both JSON parsing errors and custom ValueError from _extract_json_from_response or _validate_intents_schema
-            print(f"ERROR: JSON parsing or validation error for Awan LLM: {e}")
+            # Catch both JSON parsing errors and the ValueError raised by _postprocess_intent_response
+            logger.error("JSON parsing or validation error for Awan LLM: %s", e)
             return [{"action": "None"}]
         except requests.exceptions.RequestException as e:
-            print(f"ERROR: Network or API request error with Awan LLM: {e}")
+            logger.error("Network or API request error with Awan LLM: %s", e)
             return [{"action": "None"}]
         except Exception as e:
-            print(f"ERROR: General exception calling Awan LLM API for intent parsing: {e}")
+            logger.exception("General exception calling Awan LLM API for intent parsing: %s", e)
             return [{"action": "None"}]
 
     def generate_response(self, prompt: str, history: list[dict] = None, system_prompt: str = SYSTEM_CHAT) -> str:
@@ -97,18 +123,14 @@ class AwanLLMClient(LLMClient):
             **self.base_params,
             "messages": messages
         }
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
         try:
-            res = requests.post(self.api_url, headers=headers, json=payload)
+            res = self._session.post(self.api_url, data=json_dumps(payload), timeout=Config.LLM_REQUEST_TIMEOUT)
             res.raise_for_status()
-            return res.json()["choices"][0]["message"]["content"].strip()
+            return json_loads(res.content)["choices"][0]["message"]["content"].strip()
         except requests.exceptions.RequestException as e:
-            print(f"Error calling Awan LLM API for chat response: {e}")
+            logger.error("Error calling Awan LLM API for chat response: %s", e)
             return "I apologize, but I'm having trouble generating a response right now."
         except Exception as e:
-            print(f"Error processing Awan LLM chat response: {e}")
+            logger.error("Error processing Awan LLM chat response: %s", e)
             return "I apologize, but I'm having trouble generating a response right now."
 
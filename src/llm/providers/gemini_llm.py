@@ -1,12 +1,24 @@
 # llm/providers/gemini_llm.py
+import asyncio
+import hashlib
 import json
+import logging
+import threading
+import time
 from typing import List, Dict, Optional
 
-from openai import OpenAI
+import httpx
+from openai import OpenAI, AsyncOpenAI
 
-from llm.llm_client import LLMClient, BASE_SYSTEM_PARSER, SYSTEM_CHAT
+from llm.llm_client import LLMClient, SYSTEM_CHAT, CURRENT_CONTEXT_MARKER, build_parser_prompt, split_parser_prompt, intent_cache_prompt, read_streamed_json_text, read_streamed_json_text_async, json_loads
+from llm.intent_cache import intent_cache, semantic_intent_cache
 from config import Config
 
+logger = logging.getLogger(__name__)
+
+GEMINI_OPENAI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+GEMINI_CACHED_CONTENTS_URL = "https://generativelanguage.googleapis.com/v1beta/cachedContents"
+
 
 class GeminiLLMClient(LLMClient):
     """
@@ -18,10 +30,16 @@ class GeminiLLMClient(LLMClient):
     """
 
     def __init__(self):
+        # Bounded timeout and retries (the SDK backs off exponentially on timeouts, 429 and 5xx)
         self.client = OpenAI(
             api_key=Config.GEMINI_API_KEY,
-            base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+            base_url=GEMINI_OPENAI_BASE_URL,
+            timeout=Config.LLM_REQUEST_TIMEOUT,
+            max_retries=Config.LLM_MAX_RETRIES,
         )
+        # Async twin, created lazily for the event loop that first awaits it (see _get_async_client)
+        self.async_client = None
+        self._async_loop = None
         self.model = Config.GEMINI_MODEL
         
         # Generation defaults mapped from config
@@ -29,7 +47,42 @@ class GeminiLLMClient(LLMClient):
         self.temperature = getattr(Config, "LLM_TEMPERATURE", 0.2)
         self.top_p = getattr(Config, "LLM_TOP_P", 0.95)
         self.max_tokens = getattr(Config, "LLM_MAX_TOKENS", 1024)
+
+        # Server-side context caches: digest of static parser prompt -> (cachedContents name or None, expiry_ts)
+        self._context_caches = {}
+        self._context_cache_lock = threading.Lock()
     
+    def prewarm(self):
+        # Cheap authenticated call that leaves a pooled connection to the endpoint
+        self.client.models.list()
+
+    def _get_async_client(self) -> AsyncOpenAI:
+        """
+        AsyncOpenAI for the running event loop, with a wide keep-alive pool so batches of commands can
+        be awaited concurrently. An httpx pool cannot be shared across loops, so a new one is made when
+        the loop changes; await aclose() before a loop ends to release its connections.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_loop = loop
+            self.async_client = AsyncOpenAI(
+                api_key=Config.GEMINI_API_KEY,
+                base_url=GEMINI_OPENAI_BASE_URL,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                    timeout=httpx.Timeout(Config.LLM_REQUEST_TIMEOUT),
+                ),
+                timeout=Config.LLM_REQUEST_TIMEOUT,
+                max_retries=Config.LLM_MAX_RETRIES,
+            )
+        return self.async_client
+
+    async def aclose(self):
+        if self.async_client is not None:
+            await self.async_client.close() # Also closes its httpx.AsyncClient
+            self.async_client = None
+            self._async_loop = None
+
     # ---- Intent parsing -----------------------------------------------------
 
     def parse_intents(
@@ -42,37 +95,162 @@ class GeminiLLMClient(LLMClient):
         Rules are provided via system message (BASE_SYSTEM_PARSER + dynamic actions).
         """
         # Build the system prompt: rules + dynamic actions
-        system_instruction = BASE_SYSTEM_PARSER
-        if available_actions_prompt:
-            system_instruction += available_actions_prompt
+        system_instruction = build_parser_prompt(available_actions_prompt)
+
+        # Repeated commands under the same prompt (within the same minute) skip the API call entirely
+        cache_prompt = intent_cache_prompt(system_instruction)
+        cache_key = intent_cache.make_key("gemini", self.model, cache_prompt, user_input)
+        cached_intents = intent_cache.get(cache_key)
+        if cached_intents is not None:
+            return cached_intents
+        # Paraphrases of earlier commands can reuse their intents too (no-op unless enabled); scoped on
+        # the static prompt only, so hits are not limited to the current minute
+        semantic_scope = intent_cache.make_key("gemini", self.model, split_parser_prompt(system_instruction)[0], "")
+        cached_intents, input_embedding = semantic_intent_cache.lookup(semantic_scope, user_input)
+        if cached_intents is not None:
+            return cached_intents
 
         try:
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                temperature=Config.LLM_TEMPERATURE,
-                top_p=Config.LLM_TOP_P,
-                max_tokens=Config.LLM_MAX_TOKENS,
-                messages=[
-                    {"role": "system", "content": system_instruction},
-                    {"role": "user", "content": user_input},
-                ],
+            # Streamed so reading can stop as soon as the JSON array is complete
+            stream = self.client.chat.completions.create(
+                stream=True,
+                **self._intent_request_kwargs(system_instruction, user_input)
             )
+            with stream: # Only closes the connection if the model overran the drain budget
+                raw = read_streamed_json_text(self._stream_deltas(stream))
+            intents, cacheable = self._postprocess_intent_response(raw)
+            if cacheable: # Fallbacks for replies without JSON are not cached
+                intent_cache.put(cache_key, intents)
+                semantic_intent_cache.add(semantic_scope, input_embedding, intents)
+            return intents
+
+        except (json.JSONDecodeError, ValueError) as e:
+            # If parsing/validation fails, fall back to a neutral, safe intent.
+            logger.error("JSON parsing/validation error (Gemini/OpenAI compat): %s", e)
+            return [{"action": "none"}]
+        except Exception as e:
+            logger.error("Gemini/OpenAI-compat intent call failed: %s", e)
+            return [{"action": "none"}]
 
-            raw = (completion.choices[0].message.content or "").strip()
-            intents = self._extract_json_from_response(raw)
+    async def parse_intents_async(
+        self,
+        user_input: str,
+        available_actions_prompt: str = ""
+    ) -> List[Dict]:
+        """Same as parse_intents, awaiting the shared async HTTP pool instead of blocking."""
+        system_instruction = build_parser_prompt(available_actions_prompt)
 
-            # Validate minimal schema (raises ValueError on issues)
-            self._validate_intents_schema(intents)
+        cache_prompt = intent_cache_prompt(system_instruction)
+        cache_key = intent_cache.make_key("gemini", self.model, cache_prompt, user_input)
+        cached_intents = intent_cache.get(cache_key)
+        if cached_intents is not None:
+            return cached_intents
+        semantic_scope = intent_cache.make_key("gemini", self.model, split_parser_prompt(system_instruction)[0], "")
+        cached_intents, input_embedding = semantic_intent_cache.lookup(semantic_scope, user_input)
+        if cached_intents is not None:
+            return cached_intents
+
+        try:
+            stream = await self._get_async_client().chat.completions.create(
+                stream=True,
+                **self._intent_request_kwargs(system_instruction, user_input)
+            )
+            async with stream:
+                raw = await read_streamed_json_text_async(self._stream_deltas_async(stream))
+            intents, cacheable = self._postprocess_intent_response(raw)
+            if cacheable: # Fallbacks for replies without JSON are not cached
+                intent_cache.put(cache_key, intents)
+                semantic_intent_cache.add(semantic_scope, input_embedding, intents)
             return intents
 
         except (json.JSONDecodeError, ValueError) as e:
-            # If parsing/validation fails, fall back to a neutral, safe intent.
-            print(f"ERROR: JSON parsing/validation error (Gemini/OpenAI compat): {e}")
+            logger.error("JSON parsing/validation error (Gemini/OpenAI compat): %s", e)
             return [{"action": "none"}]
         except Exception as e:
-            print(f"ERROR: Gemini/OpenAI-compat intent call failed: {e}")
+            logger.error("Gemini/OpenAI-compat intent call failed: %s", e)
             return [{"action": "none"}]
 
+    def _intent_messages(self, system_instruction: str, user_input: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": system_instruction},
+            {"role": "user", "content": user_input},
+        ]
+
+    def _intent_request_kwargs(self, system_instruction: str, user_input: str) -> Dict:
+        """
+        chat.completions arguments for intent parsing. With GEMINI_CONTEXT_CACHE enabled, the static
+        rules + actions part of the prompt is served from a cachedContents entry and only the
+        current context block and the user input are sent with each request.
+        """
+        static_prompt, marker, current_context = system_instruction.partition(CURRENT_CONTEXT_MARKER)
+        cached_content = self._get_cached_content(static_prompt) if Config.GEMINI_CONTEXT_CACHE else None
+        if cached_content is None:
+            return self._completion_kwargs(self._intent_messages(system_instruction, user_input))
+
+        # Requests on a cached context may not carry their own system instruction
+        user_content = f"{(marker + current_context).strip()}\n\n{user_input}" if marker else user_input
+        kwargs = self._completion_kwargs([{"role": "user", "content": user_content}])
+        kwargs["extra_body"] = {"extra_body": {"google": {"cached_content": cached_content}}}
+        return kwargs
+
+    def _get_cached_content(self, static_prompt: str) -> Optional[str]:
+        """Returns the cachedContents name for the prompt, creating it when missing or about to expire."""
+        key = hashlib.blake2b(static_prompt.encode("utf-8"), digest_size=16).digest()
+        with self._context_cache_lock:
+            now = time.time()
+            entry = self._context_caches.get(key)
+            if entry is not None and now < entry[1]:
+                return entry[0]
+            # A failed creation (e.g. prompt below the model's minimum cacheable size) is kept as None
+            # for a full TTL too, so it is not retried on every command
+            name = self._create_cached_content(static_prompt)
+            self._context_caches = {k: v for k, v in self._context_caches.items() if now < v[1]}
+            self._context_caches[key] = (name, now + Config.GEMINI_CONTEXT_CACHE_TTL - 60) # Renew a minute early
+            return name
+
+    def _create_cached_content(self, static_prompt: str) -> Optional[str]:
+        model = self.model if self.model.startswith("models/") else f"models/{self.model}"
+        try:
+            res = httpx.post(
+                GEMINI_CACHED_CONTENTS_URL,
+                headers={"x-goog-api-key": Config.GEMINI_API_KEY},
+                json={
+                    "model": model,
+                    "systemInstruction": {"parts": [{"text": static_prompt}]},
+                    "ttl": f"{Config.GEMINI_CONTEXT_CACHE_TTL}s",
+                },
+                timeout=Config.LLM_REQUEST_TIMEOUT,
+            )
+            res.raise_for_status()
+            return json_loads(res.content)["name"]
+        except Exception as e:
+            logger.warning("Gemini context cache unavailable, sending the full prompt: %s", e)
+            return None
+
+    def _completion_kwargs(self, messages: List[Dict[str, str]]) -> Dict:
+        """Request arguments shared by the sync and async chat.completions calls."""
+        return {
+            "model": self.model,
+            "temperature": Config.LLM_TEMPERATURE,
+            "top_p": Config.LLM_TOP_P,
+            "max_tokens": Config.LLM_MAX_TOKENS,
+            "messages": messages,
+        }
+
+    @staticmethod
+    def _stream_deltas(stream):
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield delta
+
+    @staticmethod
+    async def _stream_deltas_async(stream):
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield delta
+
     # ---- General chat / reply generation -----------------------------------
 
     def generate_response(
@@ -85,6 +263,39 @@ class GeminiLLMClient(LLMClient):
         Generate a natural-language reply.
         History is mapped to role-based messages; rules go in system message.
         """
+        try:
+            completion = self.client.chat.completions.create(
+                **self._completion_kwargs(self._chat_messages(prompt, history, system_prompt))
+            )
+            return (completion.choices[0].message.content or "").strip()
+
+        except Exception as e:
+            logger.error("Gemini/OpenAI-compat chat call failed: %s", e)
+            return "I'm having trouble generating a response right now."
+
+    async def generate_response_async(
+        self,
+        prompt: str,
+        history: Optional[List[Dict]] = None,
+        system_prompt: str = SYSTEM_CHAT,
+    ) -> str:
+        """Same as generate_response, awaiting the shared async HTTP pool instead of blocking."""
+        try:
+            completion = await self._get_async_client().chat.completions.create(
+                **self._completion_kwargs(self._chat_messages(prompt, history, system_prompt))
+            )
+            return (completion.choices[0].message.content or "").strip()
+
+        except Exception as e:
+            logger.error("Gemini/OpenAI-compat chat call failed: %s", e)
+            return "I'm having trouble generating a response right now."
+
+    def _chat_messages(
+        self,
+        prompt: str,
+        history: Optional[List[Dict]],
+        system_prompt: str,
+    ) -> List[Dict[str, str]]:
         messages: List[Dict[str, str]] = [{"role": "system", "content": system_prompt}]
 
         if history:
@@ -97,17 +308,5 @@ class GeminiLLMClient(LLMClient):
 
         # Current user message
         messages.append({"role": "user", "content": prompt})
+        return messages
 
-        try:
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                temperature=Config.LLM_TEMPERATURE,
-                top_p=Config.LLM_TOP_P,
-                max_tokens=Config.LLM_MAX_TOKENS,
-                messages=messages,
-            )
-            return (completion.choices[0].message.content or "").strip()
-
-        except Exception as e:
-            print(f"ERROR: Gemini/OpenAI-compat chat call failed: {e}")
-            return "I'm having trouble generating a response right now."
@@ -1,9 +1,14 @@
 import json
+import logging
 import requests
-import re
-from llm.llm_client import LLMClient, BASE_SYSTEM_PARSER, SYSTEM_CHAT
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from llm.llm_client import LLMClient, SYSTEM_CHAT, build_parser_prompt, split_parser_prompt, intent_cache_prompt, iter_sse_deltas, read_streamed_json_text, json_loads, json_dumps, json_string_fragment
+from llm.intent_cache import intent_cache, semantic_intent_cache
 from config import Config
 
+logger = logging.getLogger(__name__)
+
 class NovitaLLMClient(LLMClient):
     """LLMClient implementation for Hugging Face Inference API via Novita AI using direct requests."""
 
@@ -15,12 +20,25 @@ class NovitaLLMClient(LLMClient):
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
-
-    def _prepare_payload(self, messages: list[dict], is_intent_parsing: bool = False) -> dict:
-        """Prepares the common payload structure for Novita AI."""
-        payload = {
+        # Keep-alive session shared by both methods, so each call skips the TCP/TLS handshake
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=Config.LLM_MAX_RETRIES,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False,
+            ),
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        # Constant part of every request body, built once instead of per call
+        self._payload_template = {
             "model": self.model_name,
-            "messages": messages,
             "temperature": Config.LLM_TEMPERATURE,
             "top_p": Config.LLM_TOP_P,
             "top_k": Config.LLM_TOP_K,
@@ -29,52 +47,66 @@ class NovitaLLMClient(LLMClient):
             "min_p": Config.LLM_MIN_P,
             "presence_penalty": Config.LLM_PRESENCE_PENALTY,
             "frequency_penalty": Config.LLM_FREQUENCY_PENALTY,
-            "stream": False, # Keep as False for current parsing logic
+            "response_format": {"type": "text"},
         }
-        
-        payload["response_format"] = {"type": "text"} 
-        
-        return payload
+
+    def _prepare_payload(self, messages: list[dict], is_intent_parsing: bool = False) -> dict:
+        """Prepares the common payload structure for Novita AI."""
+        # Intents are streamed so reading can stop at the end of the JSON array
+        return {**self._payload_template, "messages": messages, "stream": is_intent_parsing}
+
+    def prewarm(self):
+        # Any response (even 405) leaves a pooled keep-alive connection behind
+        self._session.head(self.api_url, timeout=5)
 
     def parse_intents(self, user_input: str, available_actions_prompt: str = "") -> list[dict]:
         
-        full_system_parser_prompt = BASE_SYSTEM_PARSER 
-        if available_actions_prompt:
-            full_system_parser_prompt += available_actions_prompt
+        full_system_parser_prompt = build_parser_prompt(available_actions_prompt)
+        static_prompt, current_context = split_parser_prompt(full_system_parser_prompt)
+
+        # Repeated commands under the same prompt (within the same minute) skip the API call entirely
+        cache_prompt = intent_cache_prompt(full_system_parser_prompt)
+        cache_key = intent_cache.make_key("novita", self.model_name, cache_prompt, user_input)
+        cached_intents = intent_cache.get(cache_key)
+        if cached_intents is not None:
+            return cached_intents
+        # Paraphrases of earlier commands can reuse their intents too (no-op unless enabled); scoped on
+        # the static prompt only, so hits are not limited to the current minute
+        semantic_scope = intent_cache.make_key("novita", self.model_name, static_prompt, "")
+        cached_intents, input_embedding = semantic_intent_cache.lookup(semantic_scope, user_input)
+        if cached_intents is not None:
+            return cached_intents
 
+        # The static rules + actions are pre-encoded once per actions list; the per-request date/time
+        # block rides with the user message, as on Gemini's cached-context path
         messages = [
-            {"role": "system", "content": full_system_parser_prompt},
-            {"role": "user", "content": user_input}
+            {"role": "system", "content": json_string_fragment(static_prompt)},
+            {"role": "user", "content": f"{current_context.strip()}\n\n{user_input}" if current_context else user_input}
         ]
 
         payload = self._prepare_payload(messages, is_intent_parsing=True)
         
         try:
-            res = requests.post(self.api_url, headers=self.headers, json=payload, timeout=Config.LLM_REQUEST_TIMEOUT)
-            res.raise_for_status()
-            
-            raw_response_text = res.json()["choices"][0]["message"]["content"]
-            
-            # Use the shared helper method to extract and parse JSON
-            parsed_json = self._extract_json_from_response(raw_response_text)
-            
-            # This specific check for missing/None 'action' key can remain here
-            # as it's a final validation specific to intent parsing structure.
-            if not parsed_json or not isinstance(parsed_json[0], dict) or parsed_json[0].get("action") is None:
-                print(f"DEBUG: Triggering clarify action due to missing/None 'action' key in LLM response.")
-                return [{"action": "None"}]
+            res = self._session.post(self.api_url, data=json_dumps(payload), timeout=Config.LLM_REQUEST_TIMEOUT, stream=True)
+            with res: # Only closes the connection if the model overran the drain budget
+                res.raise_for_status()
+                raw_response_text = read_streamed_json_text(iter_sse_deltas(res.iter_lines()))
 
+            parsed_json, cacheable = self._postprocess_intent_response(raw_response_text)
+            if cacheable: # Fallbacks for replies without JSON are not cached
+                intent_cache.put(cache_key, parsed_json)
+                semantic_intent_cache.add(semantic_scope, input_embedding, parsed_json)
             return parsed_json
 
         except (json.JSONDecodeError, ValueError) as e:
-            # Catch both JSON parsing errors and custom ValueError from _extract_json_from_response
-            print(f"ERROR: JSON parsing or validation error for Novita AI LLM: {e}")
+            # Catch both JSON parsing errors and the ValueError raised by _postprocess_intent_response
+            logger.error("JSON parsing or validation error for Novita AI LLM: %s", e)
             return [{"action": "None"}]
         except requests.exceptions.RequestException as e:
-            print(f"ERROR: Network or API request error with Novita AI LLM: {e}")
+            logger.error("Network or API request error with Novita AI LLM: %s", e)
             return [{"action": "None"}]
         except Exception as e:
-            print(f"ERROR: General exception calling Novita AI LLM API for intent parsing: {e}")
+            logger.exception("General exception calling Novita AI LLM API for intent parsing: %s", e)
             return [{"action": "None"}]
 
     def generate_response(self, prompt: str, history: list[dict] = None, system_prompt: str = SYSTEM_CHAT) -> str:
@@ -92,12 +124,12 @@ class NovitaLLMClient(LLMClient):
         payload = self._prepare_payload(messages)
 
         try:
-            res = requests.post(self.api_url, headers=self.headers, json=payload, timeout=Config.LLM_REQUEST_TIMEOUT)
+            res = self._session.post(self.api_url, data=json_dumps(payload), timeout=Config.LLM_REQUEST_TIMEOUT)
             res.raise_for_status()
-            return res.json()["choices"][0]["message"]["content"].strip()
+            return json_loads(res.content)["choices"][0]["message"]["content"].strip()
         except requests.exceptions.RequestException as e:
-            print(f"Error calling Novita AI LLM API for chat response: {e}")
+            logger.error("Error calling Novita AI LLM API for chat response: %s", e)
             return "I apologize, but I'm having trouble generating a response right now."
         except Exception as e:
-            print(f"Error processing Novita AI LLM chat response: {e}")
+            logger.error("Error processing Novita AI LLM chat response: %s", e)
             return "I apologize, but I'm having trouble generating a response right now."
@@ -7,6 +7,9 @@ class BaseAutomationModule(ABC):
     Each module should inherit from this and implement the required methods.
     """
 
+    # Empty slots keep the base class from forcing a __dict__ on subclasses that declare their own __slots__
+    __slots__ = ()
+
     @abstractmethod
     def get_supported_actions(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -13,7 +13,7 @@ import logging
 import datetime
 import os.path
 import json
-import time # For performance measurement
+import time # For performance measurement (monotonic perf_counter_ns)
 
 # Google API imports
 from google.auth.transport.requests import Request
@@ -56,6 +56,16 @@ class GoogleCalendarAutomation(BaseAutomationModule):
     Requires Google API setup, authentication, and credentials.
     """
 
+    __slots__ = (
+        'module_dir',
+        'resources_dir',
+        'token_path',
+        'client_secret_path',
+        'local_tz',
+        'service',
+        'is_authenticated',
+    )
+
     def __init__(self):
         self.module_dir = os.path.dirname(os.path.abspath(__file__))
         self.resources_dir = os.path.join(self.module_dir, '..', 'resources')
@@ -65,10 +75,9 @@ class GoogleCalendarAutomation(BaseAutomationModule):
         self.local_tz = pytz.timezone('Europe/Lisbon') 
 
         print("DEBUG: Authenticating Google Calendar API...")
-        auth_start_time = time.time()
+        auth_start_ns = time.perf_counter_ns()
         self.service = self._authenticate_google_calendar()
-        auth_end_time = time.time()
-        print(f"DEBUG: Google Calendar API authentication took {auth_end_time - auth_start_time:.2f} seconds.")
+        print(f"DEBUG: Google Calendar API authentication took {(time.perf_counter_ns() - auth_start_ns) / 1e9:.2f} seconds.")
 
         if self.service == "AUTHENTICATION_FAILED":
             print("WARNING: Google Calendar API authentication failed. Calendar features will be unavailable.")
@@ -198,7 +207,7 @@ class GoogleCalendarAutomation(BaseAutomationModule):
             raise ValueError(f"Invalid ISO 8601 date/time format for time_period: '{time_period}'. Error: {e}")
 
         print(f"DEBUG: Calling Google Calendar API to list events (timeMin={time_min_iso}, timeMax={time_max_iso})...")
-        api_call_start_time = time.time()
+        api_call_start_ns = time.perf_counter_ns()
         events_result = self.service.events().list(
             calendarId='primary',
             timeMin=time_min_iso,
@@ -206,8 +215,7 @@ class GoogleCalendarAutomation(BaseAutomationModule):
             singleEvents=True,
             orderBy='startTime'
         ).execute()
-        api_call_end_time = time.time()
-        print(f"DEBUG: Google Calendar API list events call took {api_call_end_time - api_call_start_time:.2f} seconds.")
+        print(f"DEBUG: Google Calendar API list events call took {(time.perf_counter_ns() - api_call_start_ns) / 1e9:.2f} seconds.")
 
         events = events_result.get('items', [])
 
@@ -295,10 +303,9 @@ class GoogleCalendarAutomation(BaseAutomationModule):
                 raise ValueError(f"Invalid start_time format for specific time event: {start_time}. Error: {e}")
 
         print(f"DEBUG: Calling Google Calendar API to create event (summary='{summary}', start_time='{start_time}')...")
-        api_call_start_time = time.time()
+        api_call_start_ns = time.perf_counter_ns()
         event = self.service.events().insert(calendarId='primary', body=event).execute()
-        api_call_end_time = time.time()
-        print(f"DEBUG: Google Calendar API create event call took {api_call_end_time - api_call_start_time:.2f} seconds.")
+        print(f"DEBUG: Google Calendar API create event call took {(time.perf_counter_ns() - api_call_start_ns) / 1e9:.2f} seconds.")
         return f"Event '{event.get('summary')}' created successfully. Link: {event.get('htmlLink')}"
 
     @safe_action
@@ -335,7 +342,7 @@ class GoogleCalendarAutomation(BaseAutomationModule):
             # No time_max_iso means search indefinitely into the future
 
         print(f"DEBUG: Calling Google Calendar API to list events for deletion search (timeMin={time_min_iso}, timeMax={time_max_iso})...")
-        api_call_start_time = time.time()
+        api_call_start_ns = time.perf_counter_ns()
         events_result = self.service.events().list(
             calendarId='primary',
             timeMin=time_min_iso,
@@ -344,30 +351,44 @@ class GoogleCalendarAutomation(BaseAutomationModule):
             singleEvents=True,
             orderBy='startTime'
         ).execute()
-        api_call_end_time = time.time()
-        print(f"DEBUG: Google Calendar API list events for deletion search took {api_call_end_time - api_call_start_time:.2f} seconds.")
+        print(f"DEBUG: Google Calendar API list events for deletion search took {(time.perf_counter_ns() - api_call_start_ns) / 1e9:.2f} seconds.")
 
         events = events_result.get('items', [])
 
-        # Filter events by summary (case-insensitive and partial match for forgiveness)
-        matching_events = [
-            event for event in events 
-            if summary.lower() in event.get('summary', '').lower()
-        ]
-
-        if not matching_events:
+        # Server-side 'q' already narrowed the results: prefer the first exact (case-insensitive) match,
+        # falling back to a partial match for forgiveness only if no exact hit exists
+        summary_folded = summary.casefold()
+        event_to_delete = None
+        first_partial_match = None
+        exact_match_count = 0
+        partial_match_count = 0
+        for event in events:
+            event_summary_folded = event.get('summary', '').casefold()
+            if event_summary_folded == summary_folded:
+                exact_match_count += 1
+                if event_to_delete is None:
+                    event_to_delete = event
+            elif summary_folded in event_summary_folded:
+                partial_match_count += 1
+                if first_partial_match is None:
+                    first_partial_match = event
+
+        match_count = exact_match_count
+        if event_to_delete is None:
+            event_to_delete = first_partial_match
+            match_count = partial_match_count
+
+        if event_to_delete is None:
             return f"No event found with summary matching '{summary}' for the period: {time_period if time_period else 'any upcoming time'}."
-        
-        if len(matching_events) > 1:
-            logging.warning(f"Multiple events found matching '{summary}'. Deleting the first one: '{matching_events[0].get('summary')}'")
-            
-        event_to_delete = matching_events[0]
+
+        if match_count > 1:
+            logging.warning(f"Multiple events found matching '{summary}'. Deleting: '{event_to_delete.get('summary')}'")
+
         event_id = event_to_delete['id']
         event_summary = event_to_delete['summary']
 
         print(f"DEBUG: Calling Google Calendar API to delete event (ID={event_id}, Summary='{event_summary}')...")
-        api_call_start_time = time.time()
+        api_call_start_ns = time.perf_counter_ns()
         self.service.events().delete(calendarId='primary', eventId=event_id).execute()
-        api_call_end_time = time.time()
-        print(f"DEBUG: Google Calendar API delete event call took {api_call_end_time - api_call_start_time:.2f} seconds.")
+        print(f"DEBUG: Google Calendar API delete event call took {(time.perf_counter_ns() - api_call_start_ns) / 1e9:.2f} seconds.")
         return f"Event '{event_summary}' deleted successfully."
@@ -1,8 +1,36 @@
-import requests, datetime
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import functools # Import functools for the decorator
 import logging # Import logging for safe_action decorator
+import copy
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
 from modules.base_automation import BaseAutomationModule
 
+# orjson is optional: when installed it decodes the (often large) forecast payloads much faster
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Geocoding results barely ever change, so they are kept on disk between runs
+GEO_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "pda", "geocache.json")
+GEO_CACHE_TTL = 180 * 86400 # seconds
+GEO_CACHE_MAXSIZE = 1024
+# Data responses are reused for a short while, per endpoint, since they only change every few minutes
+RESPONSE_CACHE_TTLS = {"weather": 600, "forecast": 3600, "air_pollution": 1800} # seconds
+RESPONSE_CACHE_MAXSIZE = 256
+REQUEST_TIMEOUT = 5 # seconds
+# Worker threads used to overlap independent OpenWeatherMap requests within one turn
+REQUEST_WORKERS = 4
+
 # Decorator for safe execution and uniform error handling
 def safe_action(func):
     @functools.wraps(func)
@@ -14,13 +42,189 @@ def safe_action(func):
             return f"[FAIL] Failed to {func.__name__.replace('_', ' ')}."
     return wrapper
 
+# Shared read-only stand-in for missing response sections, so misses don't allocate a new dict
+_NO_SECTION = MappingProxyType({})
+
+def _map_on_daemon_threads(fn, items: list, max_workers: int = REQUEST_WORKERS) -> list:
+    """
+    Calls fn on every item, up to max_workers at a time, and returns the results in order. The workers
+    are daemon threads, so unlike ThreadPoolExecutor workers an in-flight request never holds up
+    interpreter exit. The first exception raised by fn (in item order) is re-raised here.
+    """
+    results = [None] * len(items)
+    errors = [None] * len(items)
+    pending = queue.SimpleQueue()
+    for index in range(len(items)):
+        pending.put(index)
+
+    def work():
+        while True:
+            try:
+                index = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                results[index] = fn(items[index])
+            except Exception as e:
+                errors[index] = e
+
+    threads = [threading.Thread(target=work, name="meteorology", daemon=True) for _ in range(min(max_workers, len(items)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for error in errors:
+        if error is not None:
+            raise error
+    return results
+
+def _format_hour_minute(ts: int) -> str:
+    """Formats an epoch timestamp (already shifted to local time) as HH:MM."""
+    t = time.gmtime(ts)
+    return f"{t.tm_hour:02d}:{t.tm_min:02d}"
+
+def _format_day_month_time(ts: int) -> str:
+    """Formats an epoch timestamp (already shifted to local time) as DD/MM HH:MM."""
+    t = time.gmtime(ts)
+    return f"{t.tm_mday:02d}/{t.tm_mon:02d} {t.tm_hour:02d}:{t.tm_min:02d}"
+
+class _GeoDiskCache:
+    """
+    JSON file mapping a location key to its geocoding result and the time it was stored.
+    Expired entries are pruned, and the oldest dropped beyond `maxsize`, whenever the file is saved.
+    """
+
+    def __init__(self, path: str, ttl: float, maxsize: int):
+        self.path = path
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry and time.time() - entry.get("ts", 0) < self.ttl:
+            return entry["value"]
+        return None
+
+    def set(self, key: str, value: dict):
+        # Lookups may run on several worker threads, so serialize updates and file writes
+        with self._lock:
+            now = time.time()
+            entries = {k: v for k, v in self._entries.items() if now - v.get("ts", 0) < self.ttl}
+            entries[key] = {"value": value, "ts": now}
+            if len(entries) > self.maxsize:
+                newest = sorted(entries.items(), key=lambda item: item[1].get("ts", 0))[-self.maxsize:]
+                entries = dict(newest)
+            self._entries = entries # Replaced, not mutated, so unlocked get() calls see a consistent dict
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "w", encoding="utf-8") as f:
+                    json.dump(self._entries, f)
+            except OSError as e:
+                logging.warning(f"Could not write geocoding cache to {self.path}: {e}")
+
+class _TTLCache:
+    """Thread-safe LRU mapping whose entries expire after a per-entry TTL."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict() # key -> (expiry_ts, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expiry_ts, value = entry
+            if time.time() >= expiry_ts:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+def _ttl_cached(ttl_map: dict, maxsize: int = RESPONSE_CACHE_MAXSIZE):
+    """
+    Caches the JSON returned by a (self, url, params) request method, choosing the TTL from the
+    last segment of the URL path. Endpoints missing from ttl_map are never cached.
+    Values are deep-copied in and out because callers annotate the returned dict.
+    """
+    def decorator(func):
+        cache = _TTLCache(maxsize)
+
+        @functools.wraps(func)
+        def wrapper(self, url: str, params: dict):
+            ttl = ttl_map.get(url.rstrip("/").rsplit("/", 1)[-1])
+            if ttl is None:
+                return func(self, url, params)
+
+            key = (url, tuple(sorted(params.items())))
+            cached = cache.get(key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+
+            data = func(self, url, params)
+            cache.set(key, copy.deepcopy(data), ttl)
+            return data
+        return wrapper
+    return decorator
+
 class MeteorologyFunctionality(BaseAutomationModule):
+    # Actions never change at runtime, so the table lives on the class
+    _SUPPORTED_ACTIONS = {
+        "get_current_weather": {
+            "method_name": "_get_current_weather",
+            "description": "Get the current weather for a location. Can specify city, lat/lon, or zip/country_code.",
+            "example_json": '{"action":"get_current_weather","city":"London","units":"metric"}'
+        },
+        "get_forecast": {
+            "method_name": "_get_forecast",
+            "description": "Get a 5-day weather forecast in 3-hour intervals for a location. Can specify city, lat/lon, or zip/country_code.",
+            "example_json": '{"action":"get_forecast","city":"Paris","units":"imperial"}'
+        },
+        "get_air_pollution": {
+            "method_name": "_get_air_pollution",
+            "description": "Get current air pollution data for a location. Can specify city, lat/lon, or zip/country_code.",
+            "example_json": '{"action":"get_air_pollution","lat":51.5,"lon":-0.1}'
+        }
+    }
+
     def __init__(self):
         self.__base_url = "https://api.openweathermap.org"
         self.__geo_url = self.__base_url + "/geo/1.0"
         self.__data_url = self.__base_url + "/data/2.5"
         self.__api_key = "YOUR_OPENWEATHERMAP_API_KEY"
         self.__units = {"metric": "°C", "imperial": "°F", "standard": "K"}
+        # Persistent session so consecutive calls reuse the TLS connection (keep-alive)
+        self.__session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504], raise_on_status=False)
+        )
+        self.__session.mount("https://", adapter)
+        # In-memory layer in front of the disk cache, keyed on the normalized location tuple
+        self.__geo_disk_cache = _GeoDiskCache(GEO_CACHE_PATH, GEO_CACHE_TTL, GEO_CACHE_MAXSIZE)
+        self.__lookup_location = functools.lru_cache(maxsize=GEO_CACHE_MAXSIZE)(self.__fetch_location)
+        # Locations already resolved for the batch currently being executed
+        self.__turn_locations = {}
+        # Bound action methods, resolved once instead of through getattr on every call
+        self.__dispatch = {
+            details["method_name"]: getattr(self, details["method_name"])
+            for details in self._SUPPORTED_ACTIONS.values()
+        }
 
     def _api_key(self):
         return self.__api_key
@@ -28,11 +232,12 @@ class MeteorologyFunctionality(BaseAutomationModule):
     def _base_url(self):
         return self.__base_url
 
+    @_ttl_cached(RESPONSE_CACHE_TTLS)
     def _send_resquest(self, url: str, params: dict) -> dict:
         """Send a request to the REST service."""
-        response = requests.get(url, params=params)
+        response = self.__session.get(url, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
-        return response.json()
+        return _json_loads(response.content)
         
     def get_description(self) -> str:
         """Returns a brief description of the module's overall functionality."""
@@ -47,40 +252,94 @@ class MeteorologyFunctionality(BaseAutomationModule):
         - "example_json": An example of the JSON intent structure for this action,
                           as the LLM should generate it.
         """
-        return {
-            "get_current_weather": {
-                "method_name": "_get_current_weather",
-                "description": "Get the current weather for a location. Can specify city, lat/lon, or zip/country_code.",
-                "example_json": '{"action":"get_current_weather","city":"London","units":"metric"}'
-            },
-            "get_forecast": {
-                "method_name": "_get_forecast",
-                "description": "Get a 5-day weather forecast in 3-hour intervals for a location. Can specify city, lat/lon, or zip/country_code.",
-                "example_json": '{"action":"get_forecast","city":"Paris","units":"imperial"}'
-            },
-            "get_air_pollution": {
-                "method_name": "_get_air_pollution",
-                "description": "Get current air pollution data for a location. Can specify city, lat/lon, or zip/country_code.",
-                "example_json": '{"action":"get_air_pollution","lat":51.5,"lon":-0.1}'
-            }
-        }
+        return self._SUPPORTED_ACTIONS
 
     def execute_function(self, name: str, args: dict):
         """Executes the specified function with the given arguments."""
         # The method_name in get_supported_actions already includes the underscore
-        return getattr(self, name)(**args)
+        method = self.__dispatch.get(name)
+        if method is None:
+            raise ValueError(f"Unknown meteorology function: {name}")
+        return method(**args)
+
+    def batch_execute(self, calls: list) -> list:
+        """
+        Executes several (method_name, args) calls concurrently and returns their results in order.
+        Each distinct location is geocoded once up front and shared by every call that targets it,
+        then the data requests run on worker threads so their network latency overlaps.
+        """
+        self.__turn_locations = {}
+
+        location_keys = set()
+        for _, args in calls:
+            try:
+                location_keys.add(self.__location_key(**args))
+            except ValueError:
+                pass # The call itself reports the missing location information
+
+        def resolve(key):
+            try:
+                self.__turn_locations[key] = self.__lookup_location(key)
+            except Exception:
+                pass # Left unresolved so the individual call surfaces the error
+
+        _map_on_daemon_threads(resolve, list(location_keys))
+
+        results = _map_on_daemon_threads(lambda call: self.execute_function(*call), calls)
+        self.__turn_locations = {}
+        return results
         
     def __resolve_coordinates(self, **kwargs) -> dict:
         """
         Get the geocoding information (latitude, longitude, city, country) for a given location.
         Supports lookup by lat/lon, zip code + country code, or city name (+ optional state/country code).
+        Results are cached in memory and on disk, so repeated lookups skip the HTTP call.
         Raises ValueError if insufficient information or no results are found.
         """
+        key = self.__location_key(**kwargs)
+        location = self.__turn_locations.get(key)
+        if location is not None:
+            return location
+        return self.__lookup_location(key)
+
+    def __location_key(self, **kwargs) -> tuple:
+        """
+        Normalize the location arguments of an action into a hashable cache key.
+        Raises ValueError if insufficient or non-numeric location information is provided.
+        """
         if "lat" in kwargs and "lon" in kwargs:
+            # Round to ~100 m so near-identical coordinates share one cache entry
+            try:
+                key = ("latlon", round(float(kwargs["lat"]), 3), round(float(kwargs["lon"]), 3))
+            except TypeError: # e.g. "lat": null from the LLM
+                raise ValueError("Latitude and longitude must be numbers.")
+        elif "zip" in kwargs and "country_code" in kwargs:
+            key = ("zip", str(kwargs["zip"]).strip().lower(), str(kwargs["country_code"]).strip().lower())
+        elif "city" in kwargs:
+            key = (
+                "city",
+                str(kwargs["city"]).strip().lower(),
+                str(kwargs.get("state_code", "")).strip().lower(),
+                str(kwargs.get("country_code", "")).strip().lower(),
+            )
+        else:
+            raise ValueError("Insufficient location information. Provide lat/lon, city, or zip + country_code.")
+        return key
+
+    def __fetch_location(self, key: tuple) -> dict:
+        """Resolve a normalized location key, consulting the disk cache before the geocoding API."""
+        disk_key = "|".join(str(part) for part in key)
+        cached = self.__geo_disk_cache.get(disk_key)
+        if cached is not None:
+            return cached
+
+        mode = key[0]
+        if mode == "latlon":
+            _, lat, lon = key
             url = f"{self.__geo_url}/reverse"
             params = {
-                "lat": kwargs["lat"],
-                "lon": kwargs["lon"],
+                "lat": lat,
+                "lon": lon,
                 "limit": 1,
                 "appid": self.__api_key
             }
@@ -88,37 +347,39 @@ class MeteorologyFunctionality(BaseAutomationModule):
             # The /reverse endpoint returns a list of locations
             if not isinstance(data, list) or not data:
                 raise ValueError("No results found for the given coordinates.")
-            return {
-                "lat": kwargs["lat"],
-                "lon": kwargs["lon"],
+            location = {
+                "lat": lat,
+                "lon": lon,
                 "city": data[0]["name"],
                 "country": data[0]["country"]
             }
 
-        elif "zip" in kwargs and "country_code" in kwargs:
+        elif mode == "zip":
+            _, zip_code, country_code = key
             url = f"{self.__geo_url}/zip"
             params = {
-                "zip": f"{kwargs['zip']},{kwargs['country_code']}",
+                "zip": f"{zip_code},{country_code}",
                 "appid": self.__api_key
             }
             data = self._send_resquest(url, params)
             # The /zip endpoint returns a single dictionary if successful
             if not isinstance(data, dict) or not data:
                 raise ValueError("No results found for the given zip code and country code.")
-            return {
+            location = {
                 "lat": data["lat"],
                 "lon": data["lon"],
                 "city": data["name"],
                 "country": data["country"]
             }
 
-        elif "city" in kwargs:
+        else:
+            _, city, state_code, country_code = key
             url = f"{self.__geo_url}/direct"
-            q = kwargs["city"]
-            if "state_code" in kwargs:
-                q += f",{kwargs['state_code']}"
-            if "country_code" in kwargs:
-                q += f",{kwargs['country_code']}"
+            q = city
+            if state_code:
+                q += f",{state_code}"
+            if country_code:
+                q += f",{country_code}"
             params = {
                 "q": q,
                 "limit": 1,
@@ -128,15 +389,15 @@ class MeteorologyFunctionality(BaseAutomationModule):
             # The /direct endpoint returns a list of locations
             if not isinstance(data, list) or not data:
                 raise ValueError("No results found for the given city.")
-            return {
+            location = {
                 "lat": data[0]["lat"],
                 "lon": data[0]["lon"],
                 "city": data[0]["name"],
                 "country": data[0]["country"]
             }
 
-        else:
-            raise ValueError("Insufficient location information. Provide lat/lon, city, or zip + country_code.")
+        self.__geo_disk_cache.set(disk_key, location)
+        return location
         
     @safe_action # Apply safe_action decorator
     def _get_current_weather(self, **kwargs) -> str:
@@ -230,53 +491,60 @@ class MeteorologyFunctionality(BaseAutomationModule):
         country = response.get("country")
         location_str = f"{location}, {country}"
 
+        # Nested sections, looked up once
+        main = response.get("main") or _NO_SECTION
+        wind = response.get("wind") or _NO_SECTION
+        sys_info = response.get("sys") or _NO_SECTION
+        unit = self.__units.get(response.get("units"))
+
         #Weather
         weather_desc = response["weather"][0].get("description").capitalize()
 
         #Temperatures
-        temp = response["main"].get("temp", None)
-        feels_like = response["main"].get("feels_like", None)
-        unit = self.__units.get(response.get('units'))
+        temp = main.get("temp")
+        feels_like = main.get("feels_like")
         temp_str = f"{temp}{unit} (feels like {feels_like}{unit})"
 
         # Humidity & Pressure
-        humidity = response["main"].get("humidity")
-        pressure = response["main"].get("pressure")
+        humidity = main.get("humidity")
+        pressure = main.get("pressure")
 
         # Wind
-        wind_speed = response.get("wind", {}).get("speed")
-        wind_deg = response.get("wind", {}).get("deg")
+        wind_speed = wind.get("speed")
+        wind_deg = wind.get("deg")
 
         # Cloudiness
-        clouds = response.get("clouds", {}).get("all")
+        clouds = (response.get("clouds") or _NO_SECTION).get("all")
 
         # Rain/Snow
-        rain = response.get("rain", {}).get("1h")
-        snow = response.get("snow", {}).get("1h")
+        rain = (response.get("rain") or _NO_SECTION).get("1h")
+        snow = (response.get("snow") or _NO_SECTION).get("1h")
 
         # Sunrise/Sunset
-        sunrise = response.get("sys", {}).get("sunrise")
-        sunset = response.get("sys", {}).get("sunset")
+        sunrise = sys_info.get("sunrise")
+        sunset = sys_info.get("sunset")
         timezone = response.get("timezone", 0)
-        sunrise_time = datetime.datetime.utcfromtimestamp(sunrise + timezone).strftime('%H:%M') if sunrise else None
-        sunset_time = datetime.datetime.utcfromtimestamp(sunset + timezone).strftime('%H:%M') if sunset else None
+        sunrise_time = _format_hour_minute(sunrise + timezone) if sunrise else None
+        sunset_time = _format_hour_minute(sunset + timezone) if sunset else None
 
         # Build message
-        report = f"Weather Report for {location_str}\n"
-        report += f"- Condition: {weather_desc}\n"
-        report += f"- Temperature: {temp_str}\n"
-        if humidity: report += f"- Humidity: {humidity}%\n"
-        if pressure: report += f"- Pressure: {pressure} hPa\n"
-        if wind_speed: report += f"- Wind: {wind_speed} m/s"
-        if wind_deg: report += f" from {wind_deg}°"
-        report += "\n"
-        if clouds is not None: report += f"- Cloudiness: {clouds}%\n"
-        if rain is not None: report += f"- Rain (last 1h): {rain} mm\n"
-        if snow is not None: report += f"- Snow (last 1h): {snow} mm\n"
+        lines = [
+            f"Weather Report for {location_str}",
+            f"- Condition: {weather_desc}",
+            f"- Temperature: {temp_str}",
+        ]
+        if humidity: lines.append(f"- Humidity: {humidity}%")
+        if pressure: lines.append(f"- Pressure: {pressure} hPa")
+        wind_line = f"- Wind: {wind_speed} m/s" if wind_speed else ""
+        if wind_deg: wind_line += f" from {wind_deg}°"
+        lines.append(wind_line)
+        if clouds is not None: lines.append(f"- Cloudiness: {clouds}%")
+        if rain is not None: lines.append(f"- Rain (last 1h): {rain} mm")
+        if snow is not None: lines.append(f"- Snow (last 1h): {snow} mm")
         if sunrise_time and sunset_time:
-            report += f"- Sunrise: {sunrise_time} | Sunset: {sunset_time}\n"
+            lines.append(f"- Sunrise: {sunrise_time} | Sunset: {sunset_time}")
 
-        return report.strip()
+        return "\n".join(lines).strip()
 
     def __format_forecast(self, response: dict):
         if not response or "list" not in response:
@@ -292,15 +560,13 @@ class MeteorologyFunctionality(BaseAutomationModule):
         header = f"5-Day Weather Forecast for {location_str}:\n"
         forecast_list = response["list"]
 
-        report = ""
-        for item in forecast_list:
-            dt = item.get("dt")
-            time_str = datetime.datetime.utcfromtimestamp(dt + timezone).strftime("%d/%m %H:%M") if dt else "Unknown time"
-            weather_desc = item["weather"][0].get("description", "No description").capitalize()
-            temp = item["main"].get("temp")
-            report += f"- [{time_str}] {weather_desc}, {temp}{unit}\n"
-            
-        return header + report.strip()
+        lines = [
+            f"- [{_format_day_month_time(item['dt'] + timezone) if item.get('dt') else 'Unknown time'}] "
+            f"{item['weather'][0].get('description', 'No description').capitalize()}, {item['main'].get('temp')}{unit}"
+            for item in forecast_list
+        ]
+
+        return header + "\n".join(lines)
         
     def __format_air_pollution(self, response: dict):
         if not response or "list" not in response:
@@ -1,13 +1,28 @@
 import functools
 import logging
 import os
+import stat
 import subprocess
+import time
 import pyautogui
 from pathlib import Path
 from shutil import copy2
 import shutil 
 from modules.base_automation import BaseAutomationModule # Ensure this is imported
 
+# pyperclip (installed alongside pyautogui) is optional: without it long texts are typed as well
+try:
+    import pyperclip
+except ImportError:
+    pyperclip = None
+
+# Files larger than this are returned as their first and last halves only
+READ_FILE_MAX_BYTES = 256 * 1024
+# Texts longer than this are pasted through the clipboard rather than typed
+TYPE_TEXT_PASTE_THRESHOLD = 200
+# Seconds to wait after the paste keystroke before the user's clipboard is restored
+PASTE_CLIPBOARD_RESTORE_DELAY = 0.2
+
 # Decorator for safe execution and uniform error handling
 def safe_action(func):
     @functools.wraps(func)
@@ -19,12 +34,116 @@ def safe_action(func):
             return f"[FAIL] Failed to {func.__name__.replace('_', ' ')}."
     return wrapper
 
+# (name, PATH, PATHEXT) -> resolved executable path; only successful lookups are stored
+_RESOLVED_EXECUTABLES = {}
+_RESOLVED_EXECUTABLES_MAXSIZE = 128
+
+def _resolve_executable(name: str, path_env: str, pathext: str):
+    """
+    Cached shutil.which lookup. PATH and PATHEXT are part of the cache key,
+    so changes to either environment variable invalidate previous results.
+    Misses are not cached, so an application installed later is found on the next try.
+    """
+    key = (name, path_env, pathext)
+    found_path = _RESOLVED_EXECUTABLES.get(key)
+    if found_path is None:
+        found_path = shutil.which(name, path=path_env or None)
+        if found_path is not None:
+            if len(_RESOLVED_EXECUTABLES) >= _RESOLVED_EXECUTABLES_MAXSIZE:
+                _RESOLVED_EXECUTABLES.clear()
+            _RESOLVED_EXECUTABLES[key] = found_path
+    return found_path
+
 class SystemAutomation(BaseAutomationModule):
     """
     Provides basic OS automation: file management, application launch,
     mouse and keyboard control via pyautogui.
     """
 
+    # Static action table, built once at class creation instead of on every call
+    _SUPPORTED_ACTIONS = {
+        "create_folder": {
+            "method_name": "create_folder",
+            "description": "Creates a new folder at the specified path.",
+            "example_json": '{"action":"create_folder","folder":"DIRECTORY"}'
+        },
+        "create_file": {
+            "method_name": "create_file",
+            "description": "Creates a new empty file at the specified path.",
+            "example_json": '{"action":"create_file","filename":"DIRECTORY/FILENAME"}'
+        },
+        "write_file": {
+            "method_name": "write_file",
+            "description": "Writes content to a file, creating it if it doesn't exist. This action overwrites existing content.",
+            "example_json": '{"action":"write_file","filename":"myfile.txt","content":"Hello World"}'
+        },
+        "append_file": { 
+            "method_name": "append_file",
+            "description": "Appends content to an existing file. If the file does not exist, it will be created.",
+            "example_json": '{"action":"append_file","filename":"mylog.txt","content":"New log entry."}'
+        },
+        "read_file": {
+            "method_name": "read_file",
+            "description": "Reads and returns the text content of a specified file.",
+            "example_json": '{"action":"read_file","filename":"my_document.txt"}'
+        },
+        "delete_file": {
+            "method_name": "delete_file",
+            "description": "Deletes a file.",
+            "example_json": '{"action":"delete_file","filename":"FILENAME"}'
+        },
+        "delete_folder": {
+            "method_name": "delete_folder",
+            "description": "Deletes a folder and its contents.",
+            "example_json": '{"action":"delete_folder","folder":"DIRECTORY"}'
+        },
+        "list_directory": {
+            "method_name": "list_directory",
+            "description": "Lists the contents (files and subfolders) of a specified **directory**.",
+            "example_json": '{"action":"list_directory","directory":"my_folder"}'
+        },
+        "rename_file": {
+            "method_name": "rename_file",
+            "description": "Renames a file.",
+            "example_json": '{"action":"rename_file","src":"old_name.txt","dest":"new_name.txt"}'
+        },
+        "copy_file": {
+            "method_name": "copy_file",
+            "description": "Copies a file from source to destination.",
+            "example_json": '{"action":"copy_file","src":"source.txt","dest":"destination/copy.txt"}'
+        },
+        "move_file": {
+            "method_name": "move_file",
+            "description": "Moves a file from source to destination.",
+            "example_json": '{"action":"move_file","src":"source.txt","dest":"destination/moved.txt"}'
+        },
+        "open_application": {
+            "method_name": "open_application",
+            "description": "Opens an application by its full path or common name. On Windows, it tries to find the executable in PATH or uses shell execution.",
+            "example_json": '{"action":"open_application","path":"notepad.exe"}' 
+        },
+        "move_mouse": {
+            "method_name": "move_mouse",
+            "description": "Moves the mouse cursor to specific X and Y coordinates.",
+            "example_json": '{"action":"move_mouse","x":100,"y":200}'
+        },
+        "click": {
+            "method_name": "click",
+            "description": "Performs a mouse click at the current cursor position or specified coordinates.",
+            "example_json": '{"action":"click"}'
+        },
+        "type_text": {
+            "method_name": "type_text",
+            "description": "Types the specified text using the keyboard.",
+            "example_json": '{"action":"type_text","text":"Hello World"}'
+        },
+        "press_key": {
+            "method_name": "press_key",
+            "description": "Presses a specific keyboard key (e.g., 'enter', 'esc', 'alt').",
+            "example_json": '{"action":"press_key","key":"enter"}'
+        },
+    }
+
     def __init__(self):
         pyautogui.FAILSAFE = True  # Move mouse to top-left corner to abort
 
@@ -38,123 +157,45 @@ class SystemAutomation(BaseAutomationModule):
         """
         Maps action names (from LLM intent) to internal method names, descriptions, and examples.
         """
-        return {
-            "create_folder": {
-                "method_name": "create_folder",
-                "description": "Creates a new folder at the specified path.",
-                "example_json": '{"action":"create_folder","folder":"DIRECTORY"}'
-            },
-            "create_file": {
-                "method_name": "create_file",
-                "description": "Creates a new empty file at the specified path.",
-                "example_json": '{"action":"create_file","filename":"DIRECTORY/FILENAME"}'
-            },
-            "write_file": {
-                "method_name": "write_file",
-                "description": "Writes content to a file, creating it if it doesn't exist. This action overwrites existing content.",
-                "example_json": '{"action":"write_file","filename":"myfile.txt","content":"Hello World"}'
-            },
-            "append_file": { 
-                "method_name": "append_file",
-                "description": "Appends content to an existing file. If the file does not exist, it will be created.",
-                "example_json": '{"action":"append_file","filename":"mylog.txt","content":"New log entry."}'
-            },
-            "read_file": {
-                "method_name": "read_file",
-                "description": "Reads and returns the text content of a specified file.",
-                "example_json": '{"action":"read_file","filename":"my_document.txt"}'
-            },
-            "delete_file": {
-                "method_name": "delete_file",
-                "description": "Deletes a file.",
-                "example_json": '{"action":"delete_file","filename":"FILENAME"}'
-            },
-            "delete_folder": {
-                "method_name": "delete_folder",
-                "description": "Deletes a folder and its contents.",
-                "example_json": '{"action":"delete_folder","folder":"DIRECTORY"}'
-            },
-            "list_directory": {
-                "method_name": "list_directory",
-                "description": "Lists the contents (files and subfolders) of a specified **directory**.",
-                "example_json": '{"action":"list_directory","directory":"my_folder"}'
-            },
-            "rename_file": {
-                "method_name": "rename_file",
-                "description": "Renames a file.",
-                "example_json": '{"action":"rename_file","src":"old_name.txt","dest":"new_name.txt"}'
-            },
-            "copy_file": {
-                "method_name": "copy_file",
-                "description": "Copies a file from source to destination.",
-                "example_json": '{"action":"copy_file","src":"source.txt","dest":"destination/copy.txt"}'
-            },
-            "move_file": {
-                "method_name": "move_file",
-                "description": "Moves a file from source to destination.",
-                "example_json": '{"action":"move_file","src":"source.txt","dest":"destination/moved.txt"}'
-            },
-            "open_application": {
-                "method_name": "open_application",
-                "description": "Opens an application by its full path or common name. On Windows, it tries to find the executable in PATH or uses shell execution.",
-                "example_json": '{"action":"open_application","path":"notepad.exe"}' 
-            },
-            "move_mouse": {
-                "method_name": "move_mouse",
-                "description": "Moves the mouse cursor to specific X and Y coordinates.",
-                "example_json": '{"action":"move_mouse","x":100,"y":200}'
-            },
-            "click": {
-                "method_name": "click",
-                "description": "Performs a mouse click at the current cursor position or specified coordinates.",
-                "example_json": '{"action":"click"}'
-            },
-            "type_text": {
-                "method_name": "type_text",
-                "description": "Types the specified text using the keyboard.",
-                "example_json": '{"action":"type_text","text":"Hello World"}'
-            },
-            "press_key": {
-                "method_name": "press_key",
-                "description": "Presses a specific keyboard key (e.g., 'enter', 'esc', 'alt').",
-                "example_json": '{"action":"press_key","key":"enter"}'
-            },
-        }
+        return self._SUPPORTED_ACTIONS
 
     # --- File Management ---
     @safe_action
     def create_folder(self, folder: str) -> str:
-        if Path(folder).exists():
+        folder_path = Path(folder)
+        if folder_path.exists():
             return f"Folder already exists: {folder}"
-        Path(folder).mkdir(parents=True, exist_ok=True)
+        folder_path.mkdir(parents=True, exist_ok=True)
         return f"Folder created: {folder}"
 
     @safe_action
     def create_file(self, filename: str) -> str:
-        if Path(filename).exists():
+        filepath = Path(filename)
+        if filepath.exists():
             return f"File already exists: {filename}"
-        Path(filename).parent.mkdir(parents=True, exist_ok=True)
-        Path(filename).write_text('')
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        filepath.write_text('')
         return f"File created: {filename}"
 
     @safe_action
     def write_file(self, filename: str, content: str) -> str:
-        Path(filename).parent.mkdir(parents=True, exist_ok=True)
-        with open(filename, "w", encoding="utf-8") as f: # "w" mode overwrites
-            f.write(content or "")
+        filepath = Path(filename)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        filepath.write_bytes((content or "").encode("utf-8")) # Overwrites existing content
         return f"File written: {filename}"
 
     @safe_action
     def append_file(self, filename: str, content: str) -> str: 
         Path(filename).parent.mkdir(parents=True, exist_ok=True)
-        with open(filename, "a", encoding="utf-8") as f: 
-            f.write(content or "")
+        with open(filename, "ab", buffering=0) as f: # Single unbuffered write of the encoded content
+            f.write((content or "").encode("utf-8"))
         return f"Content appended to file: {filename}"
 
     @safe_action
     def read_file(self, filename: str) -> str:
         """
         Reads and returns the text content of a specified file.
+        Files over READ_FILE_MAX_BYTES are truncated to their head and tail; binary files are rejected.
         """
         filepath = Path(filename)
         if not filepath.exists():
@@ -163,9 +204,32 @@ class SystemAutomation(BaseAutomationModule):
             return f"Error: Path '{filename}' is not a file. Please specify a file to read its contents."
         
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                content = f.read()
-            return f"Content of '{filename}':\n---\n{content}\n---"
+            size = filepath.stat().st_size
+            if size == 0:
+                return "\n".join([f"Content of '{filename}':", "---", "", "---"])
+
+            # Bound memory and response size: large files are shown as their head and tail only
+            half = READ_FILE_MAX_BYTES // 2
+            with open(filepath, "rb") as f:
+                if size > READ_FILE_MAX_BYTES:
+                    head = f.read(half)
+                    f.seek(-half, os.SEEK_END)
+                    tail = f.read()
+                else:
+                    head = f.read()
+                    tail = None
+
+            if b"\0" in head:
+                return f"Error: File '{filename}' appears to be a binary file and cannot be displayed as text."
+
+            content = head.decode("utf-8", errors="replace").replace("\r\n", "\n")
+            if tail is not None:
+                content = "\n".join([
+                    content,
+                    f"...truncated ({size - 2 * half} bytes omitted)...",
+                    tail.decode("utf-8", errors="replace").replace("\r\n", "\n"),
+                ])
+            return "\n".join([f"Content of '{filename}':", "---", content, "---"])
         except Exception as e:
             return f"Error reading file '{filename}': {e}"
 
@@ -184,14 +248,19 @@ class SystemAutomation(BaseAutomationModule):
 
     @safe_action
     def list_directory(self, directory: str) -> str:
-        # Check if the path exists and is a directory
-        if not Path(directory).exists():
+        # Check if the path exists and is a directory with a single stat() call
+        try:
+            dir_stat = Path(directory).stat()
+        except (FileNotFoundError, NotADirectoryError): # A path below a file raises the latter
             return f"Error: Directory '{directory}' does not exist."
-        if not Path(directory).is_dir():
+        if not stat.S_ISDIR(dir_stat.st_mode):
             return f"Error: Path '{directory}' is not a directory. Please specify a folder to list its contents."
 
-        files = os.listdir(directory)
-        return "\n".join(files) if files else "<empty>"
+        # scandir reads names from the directory stream without building os.listdir's list first
+        # (str.join still collects the names before joining them)
+        with os.scandir(directory) as entries:
+            listing = "\n".join(entry.name for entry in entries)
+        return listing or "<empty>"
 
     # --- File Operations: rename, copy, move ---
     @safe_action
@@ -216,7 +285,7 @@ class SystemAutomation(BaseAutomationModule):
     def open_application(self, path: str) -> str:
         # Windows-specific logic (since only Windows is used)
         # 1. Try to find the executable in PATH
-        found_path = shutil.which(path)
+        found_path = _resolve_executable(path, os.environ.get("PATH", ""), os.environ.get("PATHEXT", ""))
         if found_path:
             try:
                 os.startfile(found_path)
@@ -247,6 +316,16 @@ class SystemAutomation(BaseAutomationModule):
 
     @safe_action
     def type_text(self, text: str) -> str:
+        if len(text) > TYPE_TEXT_PASTE_THRESHOLD and pyperclip is not None:
+            # Long texts are pasted in a single keystroke instead of being typed key by key
+            previous_clipboard = pyperclip.paste()
+            try:
+                pyperclip.copy(text)
+                pyautogui.hotkey('ctrl', 'v')
+                time.sleep(PASTE_CLIPBOARD_RESTORE_DELAY) # Let the target application read the clipboard first
+            finally:
+                pyperclip.copy(previous_clipboard)
+            return f"Typed text: {text}"
         pyautogui.write(text)
         return f"Typed text: {text}"
 
@@ -1,57 +1,123 @@
 import sys
+import queue
 import threading
-from PyQt5 import QtWidgets, QtGui
+from PyQt5 import QtWidgets, QtGui, QtCore
 from PyQt5.QtCore import Qt, pyqtSignal, QObject, QTimer
+import speech_recognition as sr
 
 from core.voice_recognition import SpeechRecognitionModule
 from core.tts import TTSModule
 from core.backend import Backend
 from config import Config 
 
-# Custom Widget for a chat bubble
-class ChatBubble(QtWidgets.QWidget):
-    def __init__(self, text, is_user, parent=None):
+# Microphone names from the first enumeration; PortAudio device listing is slow, so it runs once per process
+_MIC_NAMES_CACHE = None
+
+# Chat transcript model: one (text, is_user) row per message. Only the visible rows are painted,
+# so long sessions no longer keep a widget tree per message alive.
+class ChatModel(QtCore.QAbstractListModel):
+    IsUserRole = Qt.UserRole + 1
+
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self.is_user = is_user
-        self.text_label = QtWidgets.QLabel(text)
-        self.text_label.setWordWrap(True)
-        self.text_label.setTextInteractionFlags(Qt.TextSelectableByMouse) # Allow text selection
-
-        # Set specific styles for the bubble
-        if self.is_user:
-            self.text_label.setStyleSheet(
-                "background-color: #007bff;"  # Blue for user
-                "color: white;"
-                "border-radius: 10px;"
-                "padding: 5px 14px;" 
-                "margin-left: 30%;" 
-                "font-size: 14px;" 
-            )
-            self.text_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter) # Align text to the left
-        else:
-            self.text_label.setStyleSheet(
-                "background-color: #4a4a4a;"  # Dark grey for assistant
-                "color: white;"
-                "border-radius: 10px;"
-                "padding: 5px 14px;" 
-                "margin-right: 30%;" # Push assistant bubble to the left
-                "font-size: 14px;" 
-            )
-            self.text_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter) # Align text to the left
-
-        layout = QtWidgets.QHBoxLayout(self)
-        layout.setContentsMargins(5, 5, 5, 5) # Added margins for spacing from edges
-
-        if self.is_user:
-            # Spacer on the left to push the bubble right
-            layout.addStretch()
-            layout.addWidget(self.text_label)
+        self._messages = [] # [text, is_user] pairs
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._messages)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        text, is_user = self._messages[index.row()]
+        if role == Qt.DisplayRole:
+            return text
+        if role == self.IsUserRole:
+            return is_user
+        return None
+
+    def append(self, text, is_user):
+        row = len(self._messages)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._messages.append([text, is_user])
+        self.endInsertRows()
+        return row
+
+    def set_text(self, row, text):
+        self._messages[row][0] = text
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def clear(self):
+        self.beginResetModel()
+        self._messages.clear()
+        self.endResetModel()
+
+
+# Paints a chat bubble per row: user messages right-aligned in blue, assistant messages left-aligned in grey
+class BubbleDelegate(QtWidgets.QStyledItemDelegate):
+    MARGIN = 5          # Space between the bubble and the row edges
+    PADDING_X = 14
+    PADDING_Y = 5
+    RADIUS = 10
+    MAX_WIDTH_RATIO = 0.7 # Bubbles take at most 70% of the view width
+    TEXT_FLAGS = Qt.AlignLeft | Qt.AlignVCenter | Qt.TextWordWrap # Always plain text, never rich-text sniffed
+    TEXT_RECT_CACHE_SIZE = 1024
+    USER_COLOR = QtGui.QColor("#007bff")      # Blue for user
+    ASSISTANT_COLOR = QtGui.QColor("#4a4a4a") # Dark grey for assistant
+    TEXT_COLOR = QtGui.QColor(Qt.white)
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.font = QtGui.QFont(view.font())
+        self.font.setPixelSize(14)
+        self.metrics = QtGui.QFontMetrics(self.font)
+        self._layout_width = None
+        self._text_rects = {} # text -> wrapped bounding rect at _layout_width
+
+    def _text_rect(self, text):
+        # Word-wrapped layout is the expensive part of painting; sizeHint and paint ask for the same
+        # rect, so results are cached per text until the available width changes
+        max_text_width = max(int(self.view.viewport().width() * self.MAX_WIDTH_RATIO) - 2 * self.PADDING_X, 1)
+        if max_text_width != self._layout_width or len(self._text_rects) > self.TEXT_RECT_CACHE_SIZE:
+            self._layout_width = max_text_width
+            self._text_rects.clear()
+        rect = self._text_rects.get(text)
+        if rect is None:
+            rect = self.metrics.boundingRect(0, 0, max_text_width, 0, self.TEXT_FLAGS, text)
+            self._text_rects[text] = rect
+        return rect
+
+    def clear_cache(self):
+        self._text_rects.clear()
+
+    def sizeHint(self, option, index):
+        text_rect = self._text_rect(index.data(Qt.DisplayRole))
+        return QtCore.QSize(self.view.viewport().width(), text_rect.height() + 2 * (self.PADDING_Y + self.MARGIN))
+
+    def paint(self, painter, option, index):
+        text = index.data(Qt.DisplayRole)
+        is_user = index.data(ChatModel.IsUserRole)
+        text_rect = self._text_rect(text)
+        bubble = QtCore.QRect(0, 0, text_rect.width() + 2 * self.PADDING_X, text_rect.height() + 2 * self.PADDING_Y)
+        if is_user:
+            bubble.moveTopRight(option.rect.topRight() + QtCore.QPoint(-self.MARGIN, self.MARGIN))
         else:
-            layout.addWidget(self.text_label)
-            # Spacer on the right to push the bubble left
-            layout.addStretch()
+            bubble.moveTopLeft(option.rect.topLeft() + QtCore.QPoint(self.MARGIN, self.MARGIN))
 
-        self.setSizePolicy(QtWidgets.QSizePolicy.Preferred, QtWidgets.QSizePolicy.Minimum)
+        color = self.USER_COLOR if is_user else self.ASSISTANT_COLOR
+        if option.state & QtWidgets.QStyle.State_Selected:
+            color = color.lighter(125)
+
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(color)
+        painter.drawRoundedRect(bubble, self.RADIUS, self.RADIUS)
+        painter.setPen(self.TEXT_COLOR)
+        painter.setFont(self.font)
+        painter.drawText(bubble.adjusted(self.PADDING_X, self.PADDING_Y, -self.PADDING_X, -self.PADDING_Y), self.TEXT_FLAGS, text)
+        painter.restore()
 
 
 class SignalBridge(QObject):
@@ -60,12 +126,33 @@ class SignalBridge(QObject):
     speak_text = pyqtSignal(str)
     reenable_input = pyqtSignal()
     clear_chat = pyqtSignal()
+    show_pending = pyqtSignal()          # append the "..." placeholder for a pending reply
+    mics_ready = pyqtSignal(list)        # microphone names enumerated off the GUI thread
+    listen_finished = pyqtSignal(object) # stop Event of the listening session that ended
 
 class AssistantGUI(QtWidgets.QMainWindow):
+    # One application-wide stylesheet, parsed once per theme change instead of per widget and per toggle.
+    # Locked inputs are greyed out through :disabled, so locking them is just setEnabled()
+    APP_QSS = (
+        "QLineEdit#messageInput:disabled { background-color: #2e2e2e; color: #777; }"
+        "QPushButton#listenButton:disabled { background-color: #555; color: #aaa; }"
+    )
+    DARK_CHAT_QSS = "QListView#chatView { background-color: #363636; }"
+    LIGHT_CHAT_QSS = "QListView#chatView { background-color: white; }"
+
     def __init__(self):
         super().__init__()
-        self.is_listening = False
+        # One long-lived daemon worker runs backend commands and listening sessions in order: no thread is
+        # spawned per message, and a call still waiting on the LLM never holds up exit
+        self._tasks = queue.Queue()
+        threading.Thread(target=self._process_tasks, daemon=True).start()
+
+        # Stop Event of the current listening session (set while idle); each session gets its own
+        self._listen_stop = threading.Event()
+        self._listen_stop.set()
         self.auto_speak = False
+        self._input_locked = False
+        self._listen_button_locked = False
         self.current_theme = 'dark'
 
         # Core modules
@@ -75,18 +162,44 @@ class AssistantGUI(QtWidgets.QMainWindow):
 
         # Signals
         self.signals = SignalBridge()
-        self.signals.update_text.connect(self.append_chat)
-        self.signals.replace_last.connect(self.replace_last_assistant)
-        self.signals.speak_text.connect(self.tts.speak)
-        self.signals.reenable_input.connect(self.reenable_ui)
-        self.signals.clear_chat.connect(self.clear_console)
+        # Connection types are explicit so Qt does not resolve them per emit. Widget updates are always
+        # queued onto the GUI thread (they are emitted from workers, and from the GUI thread in the same order)
+        self.signals.update_text.connect(self.append_chat, Qt.QueuedConnection)
+        self.signals.replace_last.connect(self.replace_last_assistant, Qt.QueuedConnection)
+        # TTSModule synthesizes on its own thread and speak() only enqueues (thread-safe), so the
+        # call is made straight from the emitting worker instead of hopping through the GUI event loop
+        self.signals.speak_text.connect(self.tts.speak, Qt.DirectConnection)
+        self.signals.reenable_input.connect(self.reenable_ui, Qt.QueuedConnection)
+        self.signals.clear_chat.connect(self.clear_console, Qt.DirectConnection) # Only emitted by the Clear button
+        self.signals.show_pending.connect(self.show_pending_reply, Qt.QueuedConnection)
+        self.signals.mics_ready.connect(self.set_input_devices, Qt.QueuedConnection)
+        self.signals.listen_finished.connect(self._on_listen_finished, Qt.QueuedConnection)
 
         # Animation timer
         self.dot_count = 0
+        self._pending_assistant_index = None # Model row of the "..." placeholder being animated
         self.anim_timer = QTimer(self)
         self.anim_timer.setInterval(500)
         self.anim_timer.timeout.connect(self.update_dots)
 
+        # Volume changes are debounced: dragging the slider applies only the value it settles on
+        self._pending_volume = None
+        self._vol_timer = QTimer(self)
+        self._vol_timer.setSingleShot(True)
+        self._vol_timer.setInterval(50)
+        self._vol_timer.timeout.connect(self._apply_volume)
+
+        # Scroll requests are coalesced: at most one scroll-to-bottom per event-loop turn
+        self._scroll_timer = QTimer(self)
+        self._scroll_timer.setSingleShot(True)
+        self._scroll_timer.setInterval(0)
+        self._scroll_timer.timeout.connect(self._do_scroll_to_bottom)
+
+        # Both themes use Fusion; setting the style is slow, so it happens once and the palettes are built once
+        QtWidgets.QApplication.setStyle("Fusion")
+        self._dark_palette = self._build_dark_palette()
+        self._light_palette = QtWidgets.QApplication.style().standardPalette()
+
         self.build_ui()
         self.apply_theme(self.current_theme)
         self.setup_ui_text()
@@ -100,20 +213,32 @@ class AssistantGUI(QtWidgets.QMainWindow):
         layout.setContentsMargins(10, 10, 10, 10)
         layout.setSpacing(10)
 
-        # Chat Display (now a QScrollArea containing a QVBoxLayout)
-        self.chat_scroll_area = QtWidgets.QScrollArea()
-        self.chat_scroll_area.setWidgetResizable(True)
-        self.chat_scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff) # Hide horizontal scrollbar
-        self.chat_display_content = QtWidgets.QWidget()
-        self.chat_display_layout = QtWidgets.QVBoxLayout(self.chat_display_content)
-        self.chat_display_layout.setAlignment(Qt.AlignTop) # Align messages to the top
-        self.chat_display_layout.setContentsMargins(0, 0, 0, 0)
-        self.chat_display_layout.setSpacing(5) # Spacing between bubbles
-        self.chat_scroll_area.setWidget(self.chat_display_content)
-        layout.addWidget(self.chat_scroll_area, stretch=1)
+        # Chat Display (a QListView over ChatModel; BubbleDelegate paints the visible messages)
+        self.chat_model = ChatModel(self)
+        self.chat_view = QtWidgets.QListView()
+        self.chat_view.setObjectName("chatView")
+        self.chat_view.setModel(self.chat_model)
+        self.chat_delegate = BubbleDelegate(self.chat_view)
+        self.chat_view.setItemDelegate(self.chat_delegate)
+        # Clearing the console resets the model in one step; cached bubble metrics go with it
+        self.chat_model.modelReset.connect(self.chat_delegate.clear_cache)
+        self.chat_view.setUniformItemSizes(False)
+        self.chat_view.setLayoutMode(QtWidgets.QListView.Batched)
+        self.chat_view.setResizeMode(QtWidgets.QListView.Adjust) # Re-wrap bubbles when the window is resized
+        self.chat_view.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.chat_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff) # Hide horizontal scrollbar
+        self.chat_view.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        # Bubbles are painted, not labels, so copying goes through Ctrl+C / the context menu on the selected message
+        copy_action = QtWidgets.QAction("Copy", self.chat_view)
+        copy_action.setShortcut(QtGui.QKeySequence.Copy)
+        copy_action.triggered.connect(self.copy_selected_message)
+        self.chat_view.addAction(copy_action)
+        self.chat_view.setContextMenuPolicy(Qt.ActionsContextMenu)
+        layout.addWidget(self.chat_view, stretch=1)
 
         # Input
         self.text_input = QtWidgets.QLineEdit()
+        self.text_input.setObjectName("messageInput")
         self.text_input.setPlaceholderText("Type a message and press Enter to submit…")
         self.text_input.returnPressed.connect(self.submit_text)
         layout.addWidget(self.text_input)
@@ -144,6 +269,7 @@ class AssistantGUI(QtWidgets.QMainWindow):
         action_layout = QtWidgets.QHBoxLayout()
         action_layout.setSpacing(10)
         self.listen_button = QtWidgets.QPushButton()
+        self.listen_button.setObjectName("listenButton")
         self.listen_button.clicked.connect(self.toggle_listening)
         action_layout.addWidget(self.listen_button)
         self.auto_speak_checkbox = QtWidgets.QCheckBox("TTS")
@@ -162,8 +288,7 @@ class AssistantGUI(QtWidgets.QMainWindow):
         self.action_dark.triggered.connect(lambda: self.change_theme('dark'))
         self.action_light.triggered.connect(lambda: self.change_theme('light'))
 
-    def apply_dark_theme(self):
-        QtWidgets.QApplication.setStyle("Fusion")
+    def _build_dark_palette(self):
         palette = QtGui.QPalette()
         palette.setColor(QtGui.QPalette.Window, QtGui.QColor(53, 53, 53))
         palette.setColor(QtGui.QPalette.WindowText, Qt.white)
@@ -178,17 +303,15 @@ class AssistantGUI(QtWidgets.QMainWindow):
         palette.setColor(QtGui.QPalette.Link, QtGui.QColor(42, 130, 218))
         palette.setColor(QtGui.QPalette.Highlight, QtGui.QColor(42, 130, 218))
         palette.setColor(QtGui.QPalette.HighlightedText, Qt.white)
-        QtWidgets.QApplication.setPalette(palette)
-        # Apply theme to the scroll area and its content
-        self.chat_scroll_area.setStyleSheet("background-color: #363636;")
-        self.chat_display_content.setStyleSheet("background-color: #363636;")
+        return palette
+
+    def apply_dark_theme(self):
+        QtWidgets.QApplication.setPalette(self._dark_palette)
+        QtWidgets.QApplication.instance().setStyleSheet(self.APP_QSS + self.DARK_CHAT_QSS)
 
     def apply_light_theme(self):
-        QtWidgets.QApplication.setStyle("Fusion")
-        QtWidgets.QApplication.setPalette(QtWidgets.QApplication.style().standardPalette())
-        # Apply theme to the scroll area and its content
-        self.chat_scroll_area.setStyleSheet("background-color: white;")
-        self.chat_display_content.setStyleSheet("background-color: white;")
+        QtWidgets.QApplication.setPalette(self._light_palette)
+        QtWidgets.QApplication.instance().setStyleSheet(self.APP_QSS + self.LIGHT_CHAT_QSS)
 
     def apply_theme(self, theme):
         if theme == 'dark': self.apply_dark_theme()
@@ -199,138 +322,170 @@ class AssistantGUI(QtWidgets.QMainWindow):
         self.setWindowTitle(Config.APP_NAME) # Set window title from Config
 
     def change_theme(self, theme):
+        if theme == self.current_theme: return
         self.current_theme = theme
         self.apply_theme(theme)
 
     def populate_input_devices(self):
-        import speech_recognition as sr
+        if _MIC_NAMES_CACHE is not None:
+            self.set_input_devices(_MIC_NAMES_CACHE)
+            return
+        # Placeholder until the enumeration thread reports back
+        self.input_device.addItems(["Default Microphone"])
+        threading.Thread(target=self._enumerate_input_devices, daemon=True).start()
+
+    def _enumerate_input_devices(self):
+        global _MIC_NAMES_CACHE
         try:
             names = sr.Microphone.list_microphone_names()
-            mics = [n for n in names if "mic" in n.lower()]
-        except:
-            mics = []
-        if not mics and 'names' in locals():
-            mics = names
+        except Exception:
+            names = []
+        _MIC_NAMES_CACHE = names
+        self.signals.mics_ready.emit(names)
+
+    def set_input_devices(self, names):
+        mics = [n for n in names if "mic" in n.casefold()] or names
         self.input_device.clear()
         self.input_device.addItems(mics or ["Default Microphone"])
 
-    def on_volume_change(self, value): self.tts.set_volume(value / 100.0)
+    def on_volume_change(self, value):
+        self._pending_volume = value / 100.0
+        self._vol_timer.start()
+
+    def _apply_volume(self): self.tts.set_volume(self._pending_volume)
     def on_auto_speak_toggle(self, state): self.auto_speak = (state == Qt.Checked)
 
     def update_listen_button(self):
-        text = "Stop Listening" if self.is_listening else "Start Listening"
+        text = "Start Listening" if self._listen_stop.is_set() else "Stop Listening"
         self.listen_button.setText(text)
 
     def toggle_listening(self):
-        if not self.is_listening: self.start_listening()
+        if self._listen_stop.is_set(): self.start_listening()
         else: self.stop_listening()
 
     def submit_text(self):
         text = self.text_input.text().strip()
         if not text: return
         self.signals.update_text.emit(text, True) # True for user message
-        self.text_input.setEnabled(False)
-        self.text_input.setStyleSheet("background-color: #2e2e2e; color: #777;")
-        self.listen_button.setEnabled(False)
-        self.listen_button.setStyleSheet("background-color: #555; color: #aaa;")
-        self.dot_count = 0
-        self.signals.update_text.emit(".", False) # False for assistant message
-        self.anim_timer.start()
-        threading.Thread(target=self.handle_text_submission, args=(text,), daemon=True).start()
+        self._set_input_locked(True)
+        self._set_listen_button_locked(True)
+        self.signals.show_pending.emit()
+        self._tasks.put((self.handle_text_submission, (text,)))
 
     def handle_text_submission(self, text):
         response = self.backend.process_command(text)
-        if self.anim_timer.isActive(): self.anim_timer.stop()
         self.signals.replace_last.emit(response)
         if self.auto_speak and response: self.signals.speak_text.emit(response)
         self.signals.reenable_input.emit()
 
     def start_listening(self):
-        self.is_listening = True
+        # A fresh Event per session, so a previous session still winding down cannot stop this one
+        self._listen_stop = threading.Event()
         self.update_listen_button()
-        self.text_input.setEnabled(False)
-        self.text_input.setStyleSheet("background-color: #2e2e2e; color: #777;")
-        self.listen_thread = threading.Thread(target=self.listen_loop, daemon=True)
-        self.listen_thread.start()
+        self._set_input_locked(True)
+        self._tasks.put((self.listen_loop, (self._listen_stop,)))
 
     def stop_listening(self):
-        self.is_listening = False
+        self._listen_stop.set()
         self.update_listen_button()
-        self.text_input.setEnabled(True)
-        self.text_input.setStyleSheet("")
-        self.listen_button.setEnabled(True)
-        self.listen_button.setStyleSheet("")
+        self._set_input_locked(False)
+        self._set_listen_button_locked(False)
         self.text_input.setFocus()
         if self.anim_timer.isActive(): self.anim_timer.stop()
 
-    def listen_loop(self):
-        while self.is_listening:
-            cmd = self.voice.listen()
-            if not self.is_listening: break
+    def listen_loop(self, stop):
+        while not stop.is_set():
+            cmd = self.voice.listen(stop)
+            if stop.is_set() or not cmd: break
             self.signals.update_text.emit(cmd, True) # True for user message
-            self.dot_count = 0
-            self.signals.update_text.emit(".", False) # False for assistant message
-            self.anim_timer.start()
+            self.signals.show_pending.emit()
             response = self.backend.process_command(cmd)
-            if self.anim_timer.isActive(): self.anim_timer.stop()
             self.signals.replace_last.emit(response)
             if self.auto_speak and response: self.signals.speak_text.emit(response)
-            self.stop_listening()
             break
-            
+        # The widgets are restored on the GUI thread
+        self.signals.listen_finished.emit(stop)
+
+    def _on_listen_finished(self, stop):
+        # Only a session that is still current and was not stopped by the user ends itself
+        if stop is self._listen_stop and not stop.is_set():
+            self.stop_listening()
+
+    def show_pending_reply(self):
+        # Runs on the GUI thread, so the animation timer is started from the thread that owns it
+        self.dot_count = 0
+        self._pending_assistant_index = self.chat_model.append(".", False) # False for assistant message
+        self.scroll_to_bottom()
+        self.anim_timer.start()
 
     def update_dots(self):
-        # Get the last item in the chat_display_layout, which should be the assistant's message bubble
-        if self.chat_display_layout.count() > 0:
-            last_bubble_widget = self.chat_display_layout.itemAt(self.chat_display_layout.count() - 1).widget()
-            if isinstance(last_bubble_widget, ChatBubble) and not last_bubble_widget.is_user:
-                current_text = last_bubble_widget.text_label.text()
-                self.dot_count = (self.dot_count + 1) % 3
-                new_dots = '.' * (self.dot_count + 1)
-                last_bubble_widget.text_label.setText(new_dots)
-                self.scroll_to_bottom()
+        if self._pending_assistant_index is None: return
+        self.dot_count = (self.dot_count + 1) % 3
+        self.chat_model.set_text(self._pending_assistant_index, '.' * (self.dot_count + 1))
+
+    # Widget state only changes when needed; each change re-polishes the widget against APP_QSS
+    def _set_input_locked(self, locked):
+        if locked == self._input_locked: return
+        self._input_locked = locked
+        self.text_input.setEnabled(not locked)
+
+    def _set_listen_button_locked(self, locked):
+        if locked == self._listen_button_locked: return
+        self._listen_button_locked = locked
+        self.listen_button.setEnabled(not locked)
 
     def reenable_ui(self):
         self.text_input.clear()
-        self.text_input.setEnabled(True)
-        self.text_input.setStyleSheet("")
-        self.listen_button.setEnabled(True)
-        self.listen_button.setStyleSheet("")
+        self._set_input_locked(False)
+        self._set_listen_button_locked(False)
         self.update_listen_button()
         self.text_input.setFocus()
 
     def append_chat(self, text, is_user):
-        bubble = ChatBubble(text, is_user)
-        self.chat_display_layout.addWidget(bubble)
+        self.chat_model.append(text, is_user)
         self.scroll_to_bottom()
 
     def replace_last_assistant(self, text):
-        if self.chat_display_layout.count() > 0:
-            last_bubble_widget = self.chat_display_layout.itemAt(self.chat_display_layout.count() - 1).widget()
-            if isinstance(last_bubble_widget, ChatBubble) and not last_bubble_widget.is_user:
-                last_bubble_widget.text_label.setText(text)
-                self.scroll_to_bottom()
+        if self.anim_timer.isActive(): self.anim_timer.stop()
+        row = self._pending_assistant_index
+        self._pending_assistant_index = None
+        if row is not None:
+            self.chat_model.set_text(row, text)
+            self.scroll_to_bottom()
         else:
-            # Fallback: if no messages, just append
+            # Fallback: no pending placeholder (e.g. the console was cleared), just append
             self.append_chat(text, False)
 
+    def copy_selected_message(self):
+        indexes = self.chat_view.selectionModel().selectedIndexes()
+        if indexes:
+            QtWidgets.QApplication.clipboard().setText(indexes[0].data(Qt.DisplayRole))
+
     def clear_console(self):
-        # Clear the chat display
-        while self.chat_display_layout.count():
-            item = self.chat_display_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
+        # Clear the chat display; a pending placeholder goes with it, so its dot animation stops too
+        if self.anim_timer.isActive(): self.anim_timer.stop()
+        self._pending_assistant_index = None
+        self.chat_model.clear()
         
         # Reset the backend's conversation history
         self.backend.clear_conversation_history()
 
     def scroll_to_bottom(self):
-        self.chat_scroll_area.verticalScrollBar().setValue(self.chat_scroll_area.verticalScrollBar().maximum())
+        if not self._scroll_timer.isActive(): self._scroll_timer.start()
+
+    def _do_scroll_to_bottom(self):
+        self.chat_view.scrollToBottom()
+
+    def _process_tasks(self):
+        while True:
+            fn, args = self._tasks.get()
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"ERROR: Background task '{fn.__name__}' failed: {e}")
 
     def closeEvent(self, event):
-        self.is_listening = False
-        if hasattr(self, 'listen_thread') and self.listen_thread.is_alive(): self.listen_thread.join(1)
+        self._listen_stop.set() # The worker is a daemon thread, so exit does not wait for it
         event.accept()
 
 def main():